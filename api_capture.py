@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+api_capture.py
+──────────────
+Record the JSON traffic behind the curriculum SPA and extract from it
+
+• API_CAPTURE=1 – options() turns on Chrome's performance log and the
+  crawlers call drain(d, page, label) after each page; every XHR/fetch
+  JSON response (body via CDP Network.getResponseBody) is kept under
+  FIXTURE_DIR, indexed by the page that triggered it
+• the fixture dir doubles as an offline corpus: everything below the
+  capture hooks runs without a browser
+• api_lines() turns a page's captured JSON into the same (text, font,
+  size, indent) lines as the DOM path – every object carrying a
+  content-description code becomes a card, its string fields its body
+
+    python api_capture.py endpoints        # data endpoints by path shape
+    python api_capture.py lines URL        # lines + word count for a row
+    python api_capture.py compare          # API vs archived DOM, per code
+    python api_capture.py check            # same over the synthetic sample
+
+The JSON → card mapping is inferred (CODE_RE / SKIP_KEYS); run compare
+over a captured sample before trusting API counts for a stage.  Both
+sides are counted the way offline_extract.py replays a card: line_words
+over its heading + card + drawer lines.  api_sample/ is SYNTHETIC: a
+hand-written page laid out like a capture (fixtures/ + archive/) with an
+invented endpoint and drawer markup – check only proves the plumbing and
+the counting rule agree with themselves, not that the JSON mapping fits
+the real site.  Run compare over a real API_CAPTURE=1 sample for that.
+"""
+
+from __future__ import annotations
+import os, re, sys, json, base64, hashlib, threading, collections
+from pathlib import Path
+from urllib.parse import urlsplit
+from page_cache import canonical
+
+CAPTURE     = os.environ.get("API_CAPTURE", "0") == "1"
+FIXTURE_DIR = Path(os.environ.get("API_FIXTURES", "api_fixtures"))
+INDEX       = FIXTURE_DIR/"index.jsonl"
+ARCHIVE_DIR = Path("archive")
+SAMPLE_DIR  = Path(__file__).with_name("api_sample")
+
+CODE_RE   = re.compile(r"^AC9[A-Z0-9]{4,}$")        # v9 content-description codes
+SKIP_KEYS = {"id", "uuid", "url", "href", "link", "slug", "type", "path", "code",
+             "image", "icon", "key", "version", "created", "modified"}
+
+say   = lambda m: print(m, flush=True)
+_lock = threading.Lock()
+
+# ─── capture (browser side) ──────────────────────────────────────────
+def options(o):
+    """Add the performance-log capability to ChromeOptions when capturing."""
+    if CAPTURE:
+        o.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return o
+
+def _save(page:str, label:str, url:str, status:int, body:str):
+    name = hashlib.sha1(f"{canonical(page)}\n{url}".encode()).hexdigest()[:16] + ".json"
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    (FIXTURE_DIR/name).write_text(body, "utf-8")
+    rec = {"page": canonical(page), "label": label, "url": url, "status": status, "file": name}
+    with _lock, INDEX.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(rec) + "\n")
+
+def drain(d, page:str, label:str="") -> int:
+    """Store every JSON XHR/fetch response logged since the last drain."""
+    if not CAPTURE: return 0
+    from selenium.common.exceptions import WebDriverException
+    n = 0
+    for e in d.get_log("performance"):
+        m = json.loads(e["message"])["message"]
+        if m["method"] != "Network.responseReceived": continue
+        p, r = m["params"], m["params"]["response"]
+        if p.get("type") not in ("XHR", "Fetch") or "json" not in r.get("mimeType", ""):
+            continue
+        try:
+            b = d.execute_cdp_cmd("Network.getResponseBody", {"requestId": p["requestId"]})
+        except WebDriverException:
+            continue                               # body already evicted
+        body = base64.b64decode(b["body"]).decode("utf-8", "replace") \
+               if b.get("base64Encoded") else b["body"]
+        _save(page, label, r["url"], r["status"], body); n += 1
+    return n
+
+# ─── fixtures (offline side) ─────────────────────────────────────────
+def index(fx:Path|None=None) -> list[dict]:
+    ix = (fx or FIXTURE_DIR)/"index.jsonl"
+    if not ix.exists(): return []
+    return [json.loads(l) for l in ix.read_text("utf-8").splitlines() if l.strip()]
+
+def responses(page:str, fx:Path|None=None):
+    """Parsed JSON bodies captured for page, oldest first (last copy per URL)."""
+    fx = fx or FIXTURE_DIR
+    latest = {r["url"]: r for r in index(fx) if r["page"] == canonical(page)}
+    for r in latest.values():
+        try:
+            yield r["url"], json.loads((fx/r["file"]).read_text("utf-8"))
+        except (OSError, ValueError):
+            continue
+
+def shape(url:str) -> str:
+    """/api/v1/items/123?x=1 → /api/v1/items/{n} – groups endpoints."""
+    path = urlsplit(url).path
+    return re.sub(r"/(\d+|[0-9a-f]{8,}|[0-9a-f-]{36})(?=/|$)", "/{n}", path)
+
+# ─── JSON → lines ────────────────────────────────────────────────────
+def _cards(node):
+    if isinstance(node, dict):
+        if any(isinstance(v, str) and CODE_RE.match(v.strip()) for v in node.values()):
+            yield node
+            return
+        for v in node.values(): yield from _cards(v)
+    elif isinstance(node, list):
+        for v in node: yield from _cards(v)
+
+def _texts(node, key=""):
+    if isinstance(node, str):
+        if key.lower() not in SKIP_KEYS and not CODE_RE.match(node.strip()) and " " in node.strip():
+            yield node
+    elif isinstance(node, dict):
+        for k, v in node.items(): yield from _texts(v, k)
+    elif isinstance(node, list):
+        for v in node: yield from _texts(v, key)
+
+def card_lines(card:dict):
+    from extractors import html_to_lines
+    code = next(v.strip() for v in card.values() if isinstance(v, str) and CODE_RE.match(v.strip()))
+    lines = [(code, "Helvetica-Bold", 14, 0)]
+    for txt in _texts(card):
+        lines += html_to_lines(txt if "<" in txt else f"<p>{txt}</p>")
+    return code, lines
+
+def api_cards(page:str, fx:Path|None=None) -> dict[str,list]:
+    """code → lines for every card found in the page's captured JSON."""
+    out = {}
+    for _, doc in responses(page, fx):
+        for c in _cards(doc):
+            code, lines = card_lines(c)
+            out.setdefault(code, lines)
+    return out
+
+def api_lines(page:str) -> list:
+    return [ln for lines in api_cards(page).values() for ln in lines]
+
+# ─── CLI ─────────────────────────────────────────────────────────────
+def endpoints():
+    hits, keys = collections.Counter(), {}
+    for r in index():
+        k = (urlsplit(r["url"]).netloc, shape(r["url"])); hits[k] += 1
+        if k not in keys:
+            try:
+                doc = json.loads((FIXTURE_DIR/r["file"]).read_text("utf-8"))
+                keys[k] = list(doc)[:8] if isinstance(doc, dict) else f"[{len(doc)}]"
+            except (OSError, ValueError):
+                keys[k] = "?"
+    for (host, path), n in hits.most_common():
+        say(f"{n:6}  {host}{path}  {keys[(host, path)]}")
+
+def compare(arch:Path=ARCHIVE_DIR, fx:Path|None=None) -> int:
+    """Per code: DOM words (archived card + drawer) vs API words → # differing."""
+    from offline_extract import card_lines as dom_lines
+    from pdf_out import line_words
+    same = diff = 0
+    for p in sorted(arch.glob("*.json")):
+        a = json.loads(p.read_text("utf-8"))
+        api = api_cards(a["url"], fx)
+        if not api: continue
+        for c in a["cards"]:
+            if c["code"] not in api: continue
+            dom = line_words(dom_lines(c))
+            got = line_words(api[c["code"]])
+            if got == dom: same += 1
+            else:
+                diff += 1; say(f"{p.stem:40} {c['code']:14} DOM {dom:5}  API {got:5}")
+    say(f"{same} codes match, {diff} differ")
+    return diff if same + diff else -1
+
+def check() -> bool:
+    """compare() over the synthetic api_sample/ – a self-test, not site evidence."""
+    return compare(SAMPLE_DIR/"archive", SAMPLE_DIR/"fixtures") == 0
+
+def main(argv):
+    cmd = argv[0] if argv else "endpoints"
+    if cmd == "lines" and len(argv) > 1:
+        from pdf_out import line_words
+        lines = api_lines(argv[1])
+        for txt, *_ in lines: say(txt)
+        say(f"── {len(api_cards(argv[1]))} cards, {line_words(lines)} words")
+    elif cmd == "compare":
+        compare()
+    elif cmd == "check":
+        sys.exit(0 if check() else 1)
+    else:
+        endpoints()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+bench.py
+────────
+Offline benchmark harness – a local stand-in of the curriculum site
+
+• record: freezes N rows' worth of page-cache entries (row pages,
+  learning-area pages, drawers, snapshots, resources), their archive/
+  files and their FinalData.csv values into BENCH_DIR
+• serve: ThreadingHTTPServer over that snapshot with configurable latency
+  and jitter; every recorded URL gets a local path (manifest.json) and
+  <script> tags are stripped, so a browser sees the frozen rendered DOM
+• run: times each suite against it and checks word counts against the
+  recorded FinalData.csv values
+    fetch    – http_fetch.fetch_many vs one-by-one static_select (linked pages)
+    extract  – extractors, both backends, over every recorded document
+    offline  – offline_extract replay per row (counts checked)
+    pdf      – pdf_out.render of the replayed lines
+    browser  – description/achievement visits through Chrome (counts checked)
+  there is no content-crawler suite: its list page needs the SPA's own
+  JS (chips, detailed view, lazy cards), which the frozen DOM lacks – so
+  SCROLL_PX / SLOW are measured on real runs via spans.py, not here
+  each run appends one JSON line (git rev, latency, per-suite numbers) to
+  bench_results.jsonl, so before/after a tuning change is one diff away
+
+    python bench.py record --rows 40
+    python bench.py run --latency 0.05                  # all but browser
+    python bench.py run --suites fetch browser --latency 0.2
+    python bench.py serve --latency 0.1                 # poke at it by hand
+"""
+
+from __future__ import annotations
+import re, sys, json, time, random, shutil, argparse, tempfile, threading, subprocess
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pandas as pd
+from page_cache import PageCache, cache_key
+
+BENCH_DIR   = Path("bench_site")
+RESULTS     = Path("bench_results.jsonl")
+CSV_FILE    = Path("FinalData.csv")
+ARCHIVE_DIR = Path("archive")
+LINKED      = ("snapshot", "resource", "drawer")
+SUITES      = ("fetch", "extract", "offline", "pdf", "browser")
+
+SCRIPT_RE = re.compile(r"<script\b.*?</script\s*>", re.S | re.I)
+say  = lambda m: print(m, flush=True)
+site = lambda: PageCache(BENCH_DIR/"cache", ttl=float("inf"), max_bytes=float("inf"), enabled=True)
+
+# ─── record ──────────────────────────────────────────────────────────
+def record(rows:int):
+    from offline_extract import slug
+    src, dst = PageCache(ttl=float("inf"), enabled=True), site()
+    if BENCH_DIR.exists(): shutil.rmtree(BENCH_DIR)
+    (BENCH_DIR/"archive").mkdir(parents=True)
+    manifest, picked = {}, []
+
+    def keep(url, state) -> bool:
+        hit = src.get(url, state) if url else None
+        if not hit: return False
+        dst.put(url, hit["html"], state, **hit["meta"])
+        manifest["/" + cache_key(url, state)[:20]] = {"url": url, "state": state}
+        return True
+
+    df = pd.read_csv(CSV_FILE, dtype=str)
+    for i, r in df.iterrows():
+        if len(picked) >= rows: break
+        url = r["URL"]
+        got = [keep(url, "desc-ach"), keep(url, "understanding")]
+        hit = src.get(url, "understanding")
+        keep(hit and hit["meta"].get("target"), "expanded")
+        arch = ARCHIVE_DIR/f"{slug(r['Subject'])}__{slug(r['Year'])}.json"
+        if arch.exists():
+            shutil.copy(arch, BENCH_DIR/"archive"/arch.name); got.append(True)
+            for c in json.loads(arch.read_text("utf-8"))["cards"]:
+                keep(c.get("href"), "drawer")         # archives before card hrefs: none
+                for kind, key in (("snapshot", "snapshots"), ("resource", "resources")):
+                    for href, _ in c[key]: keep(href, kind)
+        if any(got): picked.append(i)
+    df.loc[picked].to_csv(BENCH_DIR/"expected.csv", index=False)
+    (BENCH_DIR/"manifest.json").write_text(json.dumps(manifest, indent=1), "utf-8")
+    say(f"{len(picked)} rows, {len(manifest)} pages → {BENCH_DIR}")
+
+# ─── local site ──────────────────────────────────────────────────────
+class Site(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency:float, jitter:float, port:int=0):
+        super().__init__(("127.0.0.1", port), Handler)
+        self.latency, self.jitter = latency, jitter
+        self.manifest = json.loads((BENCH_DIR/"manifest.json").read_text("utf-8"))
+        self.cache = site()
+        self.local = {(m["url"], m["state"]): p for p, m in self.manifest.items()}
+        self.hits = 0
+
+    @property
+    def base(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def url(self, real:str, state:str) -> str|None:
+        p = self.local.get((real, state))
+        return p and self.base + p
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        s = self.server; s.hits += 1
+        time.sleep(s.latency + random.uniform(0, s.jitter))
+        m = s.manifest.get(self.path.split("?")[0])
+        hit = m and s.cache.get(m["url"], m["state"])
+        if not hit:
+            self.send_error(404); return
+        body = SCRIPT_RE.sub("", hit["html"]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers(); self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+def start(latency:float, jitter:float, port:int=0) -> Site:
+    srv = Site(latency, jitter, port)
+    threading.Thread(target=srv.serve_forever, name="bench-site", daemon=True).start()
+    return srv
+
+# ─── suites ──────────────────────────────────────────────────────────
+def expected() -> pd.DataFrame:
+    return pd.read_csv(BENCH_DIR/"expected.csv", dtype=str)
+
+def checked(got:dict, col:str) -> tuple[int,int]:
+    """got: {(subject, year): wc} → (matching, compared) against expected.csv."""
+    exp = {(r["Subject"], r["Year"]): r.get(col) for _, r in expected().iterrows()}
+    pairs = [(wc, exp.get(k)) for k, wc in got.items() if isinstance(exp.get(k), str)]
+    return sum(str(wc) == e for wc, e in pairs), len(pairs)
+
+def suite_fetch(srv:Site, a) -> dict:
+    from http_fetch import fetch_many, static_select
+    from pipeline import C
+    css = {"snapshot": C().DRAWER_CSS, "resource": C().RESOURCE_CSS, "drawer": C().DRAWER_CSS}
+    urls = {k: [srv.base + p for p, m in srv.manifest.items() if m["state"] == k] for k in LINKED}
+    n = sum(map(len, urls.values()))
+    t = time.perf_counter(); ok = 0
+    for k, us in urls.items():
+        ok += sum(v is not None for v in fetch_many(us, css[k], rate=a.rate).values())
+    pooled = time.perf_counter() - t
+    t = time.perf_counter()
+    for k, us in urls.items():
+        for u in us: static_select(u, css[k])
+    seq = time.perf_counter() - t
+    return {"n": n, "ok": ok, "secs": round(pooled, 3), "per_s": round(n/max(pooled, 1e-9), 1),
+            "sequential_secs": round(seq, 3)}
+
+def documents():
+    cache, docs = site(), {"fragment": [], "expanded": [], "desc-ach": []}
+    for m in json.loads((BENCH_DIR/"manifest.json").read_text("utf-8")).values():
+        kind = "fragment" if m["state"] in LINKED else m["state"]
+        if kind in docs: docs[kind].append(cache.get(m["url"], m["state"])["html"])
+    for p in (BENCH_DIR/"archive").glob("*.json"):
+        for c in json.loads(p.read_text("utf-8"))["cards"]:
+            docs["fragment"] += [c["card"], c["drawer"]]
+    return docs
+
+def suite_extract(srv, a) -> dict:
+    import extractors as X
+    docs, out = documents(), {}
+    jobs = {"fragment": {"bs4": X.bs_lines_and_words, "lxml": X.lx_lines_and_words},
+            "expanded": {"bs4": X.bs_extract_lines,   "lxml": X.lx_extract_lines},
+            "desc-ach": {be: (lambda h, be=be: [X.lines_from(h, y, be) for y in X.DA_YEARS])
+                         for be in X.BACKENDS}}
+    for kind, fns in jobs.items():
+        if not docs[kind]: continue
+        res = {}
+        for be, fn in fns.items():
+            t = time.perf_counter(); res[be] = [fn(h) for h in docs[kind]]
+            out[f"{kind}/{be}"] = round(time.perf_counter() - t, 3)
+        out[f"{kind}/diffs"] = sum(x != y for x, y in zip(res["bs4"], res["lxml"]))
+    out["n"] = sum(map(len, docs.values()))
+    return out
+
+def suite_offline(srv, a, keep:list|None=None) -> dict:
+    import offline_extract as O
+    O.CACHE, O.ARCHIVE_DIR = site(), BENCH_DIR/"archive"
+    O.HTML_DIR = BENCH_DIR/"html"                    # not recorded → cache only
+    stages = [s for s in O.STAGES if s != "content-api"]
+    got = {s: {} for s in stages}; t = time.perf_counter()
+    for i, r in expected().iterrows():
+        for st in stages:
+            lines = O.REPLAY[st](r["Subject"], r["Year"], r["URL"])
+            if lines is None: continue
+            got[st][(r["Subject"], r["Year"])] = O.line_words(lines, O.LAYOUT[st].get("wrap"))
+            if keep is not None: keep.append((st, lines))
+    secs = time.perf_counter() - t
+    out = {"rows": len(expected()), "secs": round(secs, 3)}
+    for st in stages:
+        m, n = checked(got[st], O.STAGES[st]); out[f"{st}/match"] = f"{m}/{n}"
+    return out
+
+def suite_pdf(srv, a) -> dict:
+    import offline_extract as O
+    from pdf_out import render
+    jobs:list = []; suite_offline(srv, a, jobs)
+    with tempfile.TemporaryDirectory() as tmp:
+        t = time.perf_counter()
+        for k, (st, lines) in enumerate(jobs):
+            render(lines, Path(tmp)/f"{k}.pdf", **O.LAYOUT[st])
+        secs = time.perf_counter() - t
+    return {"n": len(jobs), "secs": round(secs, 3), "per_s": round(len(jobs)/max(secs, 1e-9), 1)}
+
+def suite_browser(srv, a) -> dict:
+    import pdf_out, browser
+    from pipeline import D
+    mod = D(); mod.CACHE.enabled = False; pdf_out.PDF_MODE = "off"
+    d = mod.start_driver(); got = {}; fails = 0
+    t = time.perf_counter()
+    try:
+        for _, r in expected().iterrows():
+            url = srv.url(r["URL"], "desc-ach")
+            if not url: continue
+            try: got[(r["Subject"], r["Year"])] = mod.process_row(d, r["Subject"], r["Year"], url)
+            except Exception: fails += 1
+    finally:
+        d.quit()
+    secs = time.perf_counter() - t
+    m, n = checked(got, mod.NEW_COL)
+    return {"rows": len(got), "fails": fails, "secs": round(secs, 3), "lean": browser.LEAN,
+            "per_row": round(secs/max(len(got), 1), 3), "desc-ach/match": f"{m}/{n}"}
+
+RUN = {"fetch": suite_fetch, "extract": suite_extract, "offline": suite_offline,
+       "pdf": suite_pdf, "browser": suite_browser}
+
+def run(a):
+    import spans, waits
+    spans.LOG_ON = waits.LOG_ON = False               # keep the real logs clean
+    srv = start(a.latency, a.jitter)
+    rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                         text=True, cwd=Path(__file__).parent).stdout.strip()
+    res = {"ts": round(time.time()), "rev": rev, "latency": a.latency,
+           "jitter": a.jitter, "rate": a.rate}
+    for s in a.suites:
+        say(f"── {s}")
+        res[s] = RUN[s](srv, a)
+        for k, v in res[s].items(): say(f"   {k:22} {v}")
+    srv.shutdown()
+    with RESULTS.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(res) + "\n")
+
+def main(argv):
+    ap = argparse.ArgumentParser(description="Offline benchmark against a recorded site")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("record"); r.add_argument("--rows", type=int, default=40)
+    for name in ("run", "serve"):
+        p = sub.add_parser(name)
+        p.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+        p.add_argument("--jitter", type=float, default=0.0)
+    sub.choices["serve"].add_argument("--port", type=int, default=8765)
+    run_p = sub.choices["run"]
+    run_p.add_argument("--suites", nargs="+", choices=SUITES,
+                       default=[s for s in SUITES if s != "browser"])
+    run_p.add_argument("--rate", type=float, default=None,
+                       help="fetch_many per-host rate (default: http_fetch.HOST_RATE)")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "record":
+        record(a.rows)
+    elif a.cmd == "serve":
+        srv = start(a.latency, a.jitter, a.port)
+        say(f"serving {len(srv.manifest)} pages on {srv.base} – Ctrl-C to stop")
+        for p, m in list(srv.manifest.items())[:5]: say(f"   {srv.base}{p}  ← {m['url']}")
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            srv.shutdown()
+    else:
+        if a.rate is None:
+            from http_fetch import HOST_RATE; a.rate = HOST_RATE
+        run(a)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
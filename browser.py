@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+browser.py
+──────────
+Shared Chrome factory with a lean, extraction-only profile
+
+• headless, page-load strategy "eager" (get() returns at DOMContentLoaded;
+  the scripts' own readiness waits still apply)
+• CDP Network.setBlockedURLs: images, web fonts, audio/video and the
+  usual analytics / tag-manager / embed hosts – nothing an extractor reads
+• no extensions, GPU, first-run or background networking
+• every page a driver leaves is logged as a "page-load" span: load time
+  (navigation start → load event) plus bytes and requests the page
+  pulled (Resource Timing – cross-origin sizes only where the server
+  sends Timing-Allow-Origin), so the savings show in `spans.py`
+• CDP settings are per tab: open_tab() gives a new tab the same blocking
+  and timing buffer before its first load, close_tab() logs it and
+  returns to the tab the caller came from
+• LEAN_BROWSER=0 keeps the factory but drops the blocking and the extra
+  switches – run a bench/spans comparison with both
+
+    from browser import start
+    d = start(headless=HEADLESS, window=(1400, 950))
+    open_tab(d, href); …; close_tab(d, home)
+"""
+
+from __future__ import annotations
+import os, contextlib
+import api_capture, spans
+
+LEAN = os.environ.get("LEAN_BROWSER", "1") != "0"
+
+BLOCKED = [
+    # images, fonts, media
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg",
+    # trackers / embeds
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*facebook.net*", "*clarity.ms*", "*newrelic.com*", "*nr-data.net*",
+    "*youtube.com/embed*", "*ytimg.com*", "*vimeo.com*", "*vimeocdn.com*",
+]
+SWITCHES = ["--disable-extensions", "--disable-gpu", "--no-first-run",
+            "--no-default-browser-check", "--disable-background-networking",
+            "--disable-sync", "--mute-audio", "--blink-settings=imagesEnabled=false"]
+
+PAGE_STATS_JS = """
+const n = performance.getEntriesByType('navigation')[0] || {};
+const r = performance.getEntriesByType('resource');
+return {url: location.href, load: n.loadEventEnd || n.domContentLoadedEventEnd || 0,
+        bytes: (n.transferSize || 0) + r.reduce((a, e) => a + (e.transferSize || 0), 0),
+        requests: r.length + 1};
+"""
+
+def options(headless:bool=True, window=(1400, 950)):
+    from selenium.webdriver.chrome.options import Options
+    o = Options()
+    if headless:
+        o.add_argument("--headless=new")
+    o.add_argument(f"--window-size={window[0]},{window[1]}")
+    if LEAN:
+        o.page_load_strategy = "eager"
+        for sw in SWITCHES: o.add_argument(sw)
+    return api_capture.options(o)
+
+def page_stats(d, tags:dict):
+    """Emit a page-load span for the page d is showing (called before leaving it)."""
+    with contextlib.suppress(Exception):
+        s = d.execute_script(PAGE_STATS_JS)
+        if s and s["url"].startswith("http"):
+            spans.emit("page-load", s["load"] / 1000, **tags,
+                       url=s["url"], bytes=s["bytes"], requests=s["requests"])
+
+def track(d):
+    """Log each page on departure (get / close / quit) with the row it was
+    opened in – tags are kept per tab."""
+    get, close, quit, tags = d.get, d.close, d.quit, {}
+    def left():
+        with contextlib.suppress(Exception):
+            page_stats(d, tags.pop(d.current_window_handle, None) or spans.ctx())
+    def tracked_get(url):
+        left(); get(url)
+        with contextlib.suppress(Exception): tags[d.current_window_handle] = spans.ctx()
+    def tracked_close():
+        left(); close()
+    def tracked_quit():
+        left(); quit()
+    d.get, d.close, d.quit = tracked_get, tracked_close, tracked_quit
+    return d
+
+def lean_tab(d):
+    """Blocking + timing buffer for the tab d is switched to (CDP is per tab)."""
+    if not LEAN: return
+    d.execute_cdp_cmd("Network.enable", {})
+    d.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED})
+    d.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                      {"source": "performance.setResourceTimingBufferSize(5000)"})
+
+def open_tab(d, url:str):
+    """Load url in a new tab that is lean before its first request."""
+    d.switch_to.new_window("tab"); lean_tab(d); d.get(url)
+
+def close_tab(d, back:str):
+    d.close(); d.switch_to.window(back)
+
+def start(headless:bool=True, window=(1400, 950)):
+    from selenium import webdriver
+    d = webdriver.Chrome(options=options(headless, window))
+    lean_tab(d)
+    d = spans.instrument(d)
+    return track(d) if spans.LOG_ON else d
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+cli.py
+──────
+One entry point for every step – each command imports only what it uses
+
+    python cli.py discover [--only nested|single] [--headless]
+    python cli.py extract-understanding [--from N] [--to M] [--per-row]
+    python cli.py extract-desc-ach      [--from N] [--to M]
+    python cli.py extract-content       [--from N] [--to M] [--workers 4]
+    python cli.py pagecount [--workers 8]
+    python cli.py report [COLUMN …] [--profile]
+
+• tunables that the modules read from the environment (INCREMENTAL,
+  RESUME, PDF_MODE, PAGE_CACHE, EXTRACT_BACKEND, …) are flags here and
+  set before the first import; script constants (HEADLESS, WAIT,
+  WORKERS, DRAWER_MODE, …) are set on the loaded script
+• report reads FinalData.csv + results.sqlite only – no pandas, Selenium
+  or reportlab – and starts in milliseconds
+• the standalone scripts still run as before
+"""
+
+from __future__ import annotations
+import os, sys, argparse
+
+ENV_SWITCHES = {          # flag → (environment variable, value when given)
+    "incremental":  ("INCREMENTAL",  "1"),
+    "no_resume":    ("RESUME",       "0"),
+    "retry_failed": ("RESUME_RETRY", "1"),
+    "no_cache":     ("PAGE_CACHE",   "0"),
+    "api_capture":  ("API_CAPTURE",  "1"),
+    "no_spans":     ("SPANS",        "0"),
+    "pdf_verify":   ("PDF_VERIFY",   "1"),
+}
+ENV_VALUES = {"pdf_mode": "PDF_MODE", "backend": "EXTRACT_BACKEND"}
+
+def apply_env(a):
+    for k, (var, val) in ENV_SWITCHES.items():
+        if getattr(a, k, False): os.environ[var] = val
+    for k, var in ENV_VALUES.items():
+        if getattr(a, k, None): os.environ[var] = getattr(a, k)
+
+def configure(mod, **consts):
+    """Override module constants that were given on the command line."""
+    for k, v in consts.items():
+        if v is not None: setattr(mod, k, v)
+    return mod
+
+def row_range(a) -> range:
+    return range(max(0, a.start), (a.end if a.end is not None else sys.maxsize) + 1)
+
+# ─── commands ────────────────────────────────────────────────────────
+def discover(a):
+    import nested_subjects_crawler as nested, single_subjects_crawler as single
+    for name, mod in (("single", single), ("nested", nested)):
+        if a.only in (None, name):
+            configure(mod, HEADLESS=a.headless, FAST_URLS=a.fast_urls).main()
+
+def extract_understanding(a):
+    from pipeline import U
+    configure(U(), HEADLESS=a.headless, WAIT=a.wait,
+              BY_SUBJECT=False if a.per_row else None).main(row_range(a))
+
+def extract_desc_ach(a):
+    from pipeline import D
+    configure(D(), HEADLESS=a.headless, WAIT=a.wait).main(row_range(a))
+
+def extract_content(a):
+    from pipeline import C
+    configure(C(), HEADLESS=a.headless, WAIT=a.wait, WORKERS=a.workers,
+              RUN_FROM=a.start, RUN_TO=a.end, DRAWER_MODE=a.drawer_mode,
+              SCROLL_PX=a.scroll_px).main([])
+
+def pagecount(a):
+    import pagecount
+    pagecount.main((["--workers", str(a.workers)] if a.workers else []) +
+                   (["--out", a.out] if a.out else []))
+
+def report(a):
+    import resume, results_store
+    resume.main(a.columns)
+    print()
+    results_store.main(["show"])
+    if a.profile:
+        import spans
+        print(); spans.summary(spans.SPAN_LOG, a.script)
+
+# ─── argument parsing ────────────────────────────────────────────────
+def parser() -> argparse.ArgumentParser:
+    ap  = argparse.ArgumentParser(prog="cli.py", description=__doc__.split("\n")[3])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = argparse.ArgumentParser(add_help=False)       # shared by browser commands
+    g = run.add_mutually_exclusive_group()
+    g.add_argument("--headless", action="store_true", default=None)
+    g.add_argument("--headed", dest="headless", action="store_false")
+    run.add_argument("--incremental", action="store_true", help="INCREMENTAL=1")
+    run.add_argument("--no-cache", action="store_true", help="PAGE_CACHE=0")
+    run.add_argument("--api-capture", action="store_true", help="API_CAPTURE=1")
+    run.add_argument("--no-spans", action="store_true", help="SPANS=0")
+
+    ext = argparse.ArgumentParser(add_help=False, parents=[run])
+    ext.add_argument("--from", dest="start", type=int, default=0, help="first row (0-based)")
+    ext.add_argument("--to", dest="end", type=int, help="last row, inclusive")
+    ext.add_argument("--wait", type=float, help="element wait in seconds")
+    ext.add_argument("--no-resume", action="store_true", help="RESUME=0: re-crawl done rows")
+    ext.add_argument("--retry-failed", action="store_true", help="RESUME_RETRY=1")
+    ext.add_argument("--pdf-mode", choices=("background", "sync", "off"))
+    ext.add_argument("--pdf-verify", action="store_true", help="PDF_VERIFY=1")
+    ext.add_argument("--backend", choices=("lxml", "bs4"), help="EXTRACT_BACKEND")
+
+    p = sub.add_parser("discover", parents=[run], help="subject crawlers → html/, data.csv")
+    p.add_argument("--only", choices=("nested", "single"))
+    p.add_argument("--no-fast-urls", dest="fast_urls", action="store_false", default=None)
+    p.set_defaults(fn=discover)
+
+    p = sub.add_parser("extract-understanding", parents=[ext], help="Understanding of the learning area")
+    p.add_argument("--per-row", action="store_true", help="no per-subject fan-out")
+    p.set_defaults(fn=extract_understanding)
+
+    p = sub.add_parser("extract-desc-ach", parents=[ext], help="Description/Achievement")
+    p.set_defaults(fn=extract_desc_ach)
+
+    p = sub.add_parser("extract-content", parents=[ext], help="Content description")
+    p.add_argument("--workers", type=int)
+    p.add_argument("--drawer-mode", choices=("url", "click"))
+    p.add_argument("--scroll-px", type=int)
+    p.set_defaults(fn=extract_content)
+
+    p = sub.add_parser("pagecount", help="PDF page counts → CombinedResults_with_pagecounts.csv")
+    p.add_argument("--workers", type=int)
+    p.add_argument("--out")
+    p.set_defaults(fn=pagecount)
+
+    p = sub.add_parser("report", help="resume plan, stored metrics, crawl profile")
+    p.add_argument("columns", nargs="*")
+    p.add_argument("--profile", action="store_true", help="add the spans.jsonl summary")
+    p.add_argument("--script", help="profile one script only")
+    p.set_defaults(fn=report)
+    return ap
+
+def main(argv=None):
+    a = parser().parse_args(argv)
+    apply_env(a)
+    a.fn(a)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -5,34 +5,67 @@ content_description_extractor.py
 Row-range runner (fast edition)
 
 • keep all functional logic from the previous version
-• one Chrome instance for the entire batch
-• shorter fixed sleeps and bigger scroll steps
+• one Chrome instance per worker for the entire batch, restarted by
+  supervisor.py on a hang, a dead renderer or memory growth (the row in
+  progress is re-run from the cache)
+• event-driven settle() waits instead of fixed sleeps, bigger scroll steps
 • CLI row range still honoured (python … 10 100)
+• optional worker count as 3rd arg (python … 10 100 4) – rows are
+  pulled from a shared queue, results upserted into results.sqlite and
+  exported to the CSV once at the end
+• cards and drawers are read with one execute_script each (code, HTML,
+  text, links as JSON) instead of a WebDriver call per attribute
+• DRAWER_MODE="url": all cards of a page are harvested first, then each
+  drawer is fetched by its own URL (pooled GET, browser fallback) – no
+  click → wait → back → re-scroll per card; the page's drawers, then all
+  the snapshots / resources they link, go out as one pooled batch each
+• API_CAPTURE=1 records the page's JSON traffic (see api_capture.py)
+• each card is streamed into the PDF and the archive as soon as it is
+  handled – card records (spooled to a temp file in url mode), drawers
+  and linked pages are held one card at a time; the PDF is rendered in
+  bounded page segments (pdf_out.SEGMENT_PAGES)
+• INCREMENTAL=1 – only rows whose page, drawers, snapshots or resources changed
+  since their count was written are re-crawled (see fingerprints.py)
+• otherwise rows with a count and a PDF are skipped before Chrome starts
+  (RESUME=0 re-crawls everything – see resume.py)
 """
 
 from __future__ import annotations
-import re, time, sys, contextlib, textwrap, traceback, pandas as pd
+import re, os, json, sys, queue, tempfile, threading, contextlib, traceback, pandas as pd
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlsplit
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup, Tag
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen.canvas import Canvas
-from PyPDF2 import PdfReader
+from page_cache import CACHE
+from link_memo import LinkMemo, MEMO_FILE      # MEMO_FILE=None → memo for this run only
+from results_store import STORE
+from fingerprints import FP, INCREMENTAL
+from resume import plan, pdf_path as stage_pdf
+from concurrent.futures import ThreadPoolExecutor
+from http_fetch import static_select, fetch_many
+from waits import settle
+from extractors import PDFLine, INDENT, words, html_to_lines, lines_and_words
+import pdf_out, api_capture, spans, browser
+from supervisor import Supervised
 
 # ─── choose rows to run ──────────────────────────────────────────────
 RUN_FROM = 0          # inclusive, 0-based
 RUN_TO   = 393          # inclusive, 0-based
-if len(sys.argv) == 3:
-    try:
-        RUN_FROM, RUN_TO = map(int, sys.argv[1:3])
-    except ValueError:
-        print("⇢  Row numbers must be integers – ignoring CLI args.\n")
+WORKERS  = 1            # parallel headless Chrome instances
+
+def parse_cli(argv):
+    global RUN_FROM, RUN_TO, WORKERS
+    if len(argv) in (3, 4):
+        try:
+            RUN_FROM, RUN_TO = map(int, argv[1:3])
+            if len(argv) == 4:
+                WORKERS = max(1, int(argv[3]))
+        except ValueError:
+            print("⇢  Row numbers / workers must be integers – ignoring CLI args.\n")
 
 # ─── basic tunables ─────────────────────────────────────────────────
 HEADLESS   = True
@@ -42,35 +75,37 @@ SLOW       = 0.03      # was 0.10
 CSV_FILE   = Path("FinalData.csv")
 NEW_COL    = "Content description"
 DATA_DIR   = Path("data")
-PDF_NAME   = "Content description-{s}-{y}.pdf"
+ARCHIVE_DIR = Path("archive")          # raw card/drawer HTML per row (offline replay)
+FAST_HTTP  = True      # try a plain GET for snapshots/resources first
+DRAWER_MODE = "url"    # "url": harvest every card first, then load each
+                       # drawer by its own URL (GET, else browser);
+                       # "click": click → read → back per card
+COUNT_SHARED = "chip"  # a linked snapshot/resource counts once per
+                       # "chip" (strand – historical totals), "page" or "run"
+
+DRAWER_CSS   = "div.main-content.shifted"
+RESOURCE_CSS = "div[id^='container-'] div.container.responsivegrid.cmp-container--spacing-small"
+RES_SEC_CSS  = "div.SlideOutContentSection.Resources-title-slideOutContentSection"
+TOGGLE_CSS   = "section.ContentToggle:not(.is-open) > header > button, button[aria-expanded='false']"
 
-FONTS   = {"h1":16, "h2":14, "h3":12, "h4":12, "h5":11, "h6":11}
-WRAP    = 100
 MARGIN  = 40
-INDENT  = 15
 LINE_SP = 1.35
 
-word_re = re.compile(r"\b[\w'-]+\b", re.UNICODE)
-words   = lambda t: len(word_re.findall(t or ""))
 slug    = lambda s: re.sub(r"[\\/:'\"*?<>|]+", "_", s.strip())
 say     = lambda m: print(m, flush=True)
 READY   = lambda d: d.execute_script("return document.readyState") == "complete"
 
 # ─── selenium helpers ───────────────────────────────────────────────
 def start_driver() -> webdriver.Chrome:
-    o = Options()
-    if HEADLESS:
-        o.add_argument("--headless=new")
-    o.add_argument("--window-size=1400,950")
-    return webdriver.Chrome(options=o)
+    return browser.start(HEADLESS, (1400, 950))
 
 def safe_click(drv, el):
-    drv.execute_script("arguments[0].scrollIntoView({block:'center'})", el)
-    drv.execute_script("arguments[0].click()", el)
+    drv.execute_script("arguments[0].scrollIntoView({block:'center'}); arguments[0].click()", el)
 
 def win_scroll(drv) -> bool:
-    prev = drv.execute_script("return document.body.scrollHeight")
-    drv.execute_script(f"window.scrollBy(0,{SCROLL_PX})"); time.sleep(.03)
+    prev = drv.execute_script("const h=document.body.scrollHeight;"
+                              "window.scrollBy(0,arguments[0]); return h", SCROLL_PX)
+    settle(drv, "scroll", .03)
     return drv.execute_script("return document.body.scrollHeight") > prev
 
 def find_text(drv, css):
@@ -79,157 +114,264 @@ def find_text(drv, css):
     return ""
 
 def open_all_accordions(drv):
-    for b in drv.find_elements(
-            By.CSS_SELECTOR,
-            "section.ContentToggle:not(.is-open) > header > button,"
-            "button[aria-expanded='false']"):
-        with contextlib.suppress(Exception):
-            safe_click(drv, b); time.sleep(.01)     # was 0.03
-
-# ─── PDF helpers (unchanged logic) ──────────────────────────────────
-PDFLine = tuple[str, str, int, int]
-
-def wrap(txt:str, width:int):
-    for seg in textwrap.wrap(txt, width) or [""]:
-        yield seg
-
-STRIP = {"script","style","noscript","svg","header","footer","nav","button"}
-
-def clean(tag:Tag):
-    for t in tag.find_all(lambda x:isinstance(x,Tag) and x.name in STRIP):
-        t.decompose()
-
-def walk(node:Tag, indent:int, out:list[PDFLine]):
-    if isinstance(node, str): return
-    for child in node.children:
-        if isinstance(child, str): continue
-        nm = child.name.lower()
-        if nm in FONTS:
-            for seg in wrap(child.get_text(" ", strip=True), WRAP):
-                out.append((seg, "Helvetica-Bold", FONTS[nm], indent))
-        elif nm == "p":
-            for seg in wrap(child.get_text(" ", strip=True), WRAP):
-                out.append((seg, "Helvetica", 10, indent))
-        elif nm in {"ul","ol"}:
-            for li in child.find_all("li", recursive=False):
-                for seg in wrap("• "+li.get_text(" ", strip=True), WRAP):
-                    out.append((seg, "Helvetica", 10, indent))
-                for sub in li.find_all(["ul","ol"], recursive=False):
-                    walk(sub, indent+INDENT, out)
-        else:
-            walk(child, indent, out)
-
-def html_to_lines(html:str, indent:int=0):
-    soup = BeautifulSoup(html, "lxml"); clean(soup)
-    out:list[PDFLine]=[]; walk(soup.body or soup, indent, out); return out
-
-def save_pdf(lines:list[PDFLine], path:Path) -> int:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    c = Canvas(str(path), pagesize=A4); _,h=A4; x0,y=MARGIN,h-MARGIN
-    for txt,fnt,sz,ind in lines:
-        c.setFont(fnt,sz)
-        if y<MARGIN: c.showPage(); y=h-MARGIN; c.setFont(fnt,sz)
-        c.drawString(x0+ind,y,txt); y-=sz*LINE_SP
-    c.save()
-    txt="\n".join(p.extract_text() or "" for p in PdfReader(str(path)).pages)
-    return words(txt)
-
-# ─── helpers for drawer / links (logic unchanged) ────────────────────
+    n = drv.execute_script(CLICK_ALL_JS, TOGGLE_CSS)
+    if n: settle(drv, "accordions", .01*n)   # was 0.01 per click
+
+# ─── bulk in-page reads: one execute_script instead of N round trips ─
+CLICK_ALL_JS = """
+const els = document.querySelectorAll(arguments[0]);
+for (const b of els) { try { b.scrollIntoView({block:'center'}); b.click(); } catch (e) {} }
+return els.length;"""
+
+CARDS_JS = """
+const hdr = document.querySelector('header#' + CSS.escape(arguments[0]));
+const sec = hdr && hdr.closest('section'), seen = new Set(arguments[1]);
+if (!sec) return [];
+return [...sec.querySelectorAll('.ContentDescription')].flatMap(c => {
+  const a = c.querySelector('a.ContentDescription-code');
+  const code = a ? a.innerText.trim() : '';
+  return a && !seen.has(code || '(no-code)')
+    ? [{code: code, html: c.innerHTML, text: c.innerText, href: a.href, a: a}] : [];
+});"""
+
+DRAWER_JS = """
+const body = document.querySelector(arguments[0]), sec = body.querySelector(arguments[1]);
+const tail = h => new URL(h).pathname.split('/').pop();
+return {html: body.outerHTML, text: body.innerText,
+  snaps: [...body.querySelectorAll("a[href*='-snapshot']")]
+           .map(a => [a.href, a.innerText.trim() || tail(a.href)]),
+  res: sec ? [...sec.querySelectorAll("a[href*='resources']")]
+           .map(a => [a.href, a.innerText.trim() || a.title || tail(a.href)]) : []};"""
+
+def section_cards(d, sid:str, seen:set=frozenset()) -> list[dict]:
+    """Cards in chip section sid not in seen (codes already handled):
+    {code, html, text, href, a (WebElement)} – only new cards cross the wire."""
+    return d.execute_script(CARDS_JS, sid, list(seen))
+
+# ─── helpers for drawer / links ──────────────────────────────────────
 def drawer_body(d):
     return WebDriverWait(d, WAIT).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR,"div.main-content.shifted")))
+        EC.presence_of_element_located((By.CSS_SELECTOR,DRAWER_CSS)))
 
 def drawer_html(d) -> str:
     return drawer_body(d).get_attribute("outerHTML")
 
-def snapshot_links(d):
-    body = drawer_body(d)
-    return {a.get_attribute("href"):
-            (a.text.strip() or urlparse(a.get_attribute("href")).path.split("/")[-1])
-            for a in body.find_elements(By.CSS_SELECTOR,"a[href*='-snapshot']")}
-
-def resource_links(d):
-    body = drawer_body(d)
-    css = "div.SlideOutContentSection.Resources-title-slideOutContentSection"
+def drawer_dump(d) -> dict:
+    """Drawer {html, text, snaps, res} – links as [href, label] pairs."""
+    drawer_body(d)                      # wait until it is there
+    return d.execute_script(DRAWER_JS, DRAWER_CSS, RES_SEC_CSS)
+
+def drawer_parse(html:str, base:str) -> dict:
+    """drawer_dump() for drawer HTML that came from the cache / a plain GET."""
+    soup = BeautifulSoup(html, "lxml")
+    tail = lambda h: urlsplit(h).path.split("/")[-1]
+    absl = lambda a: urljoin(base, a["href"])
+    sec  = soup.select_one(RES_SEC_CSS)
+    return {"html": html, "text": soup.get_text(" ", strip=True),
+            "snaps": [(h, a.get_text(strip=True) or tail(h))
+                      for a in soup.select("a[href*='-snapshot']") for h in [absl(a)]],
+            "res":   [(h, a.get_text(strip=True) or a.get("title") or tail(h))
+                      for a in (sec.select("a[href*='resources']") if sec else []) for h in [absl(a)]]}
+
+def drawer_click(d, card:dict) -> dict:
+    list_url = d.current_url
+    safe_click(d, card["a"])
+    WebDriverWait(d, WAIT).until(lambda drv: drv.current_url != list_url)
+    open_all_accordions(d)
+    drw = drawer_dump(d)
+    d.back(); WebDriverWait(d, WAIT).until(lambda drv: drv.current_url == list_url); settle(d, "drawer-back", SLOW)
+    return drw
+
+def drawer_url(d, card:dict, pre:dict) -> dict:
+    """Drawer by its own URL: prefetched / page cache → browser."""
+    href = card["href"]
+    html = pre.pop(("drawer", href), None) or (CACHE.get(href, "drawer") or {}).get("html")
+    if html: return drawer_parse(html, href)
+    d.get(href); WebDriverWait(d, WAIT).until(READY)
+    open_all_accordions(d)
+    drw = drawer_dump(d); CACHE.put(href, drw["html"], "drawer")
+    return drw
+
+# ─── process-wide snapshot / resource memo ───────────────────────────
+MEMO = LinkMemo(MEMO_FILE)
+RUN_SEEN = {"snap": set(), "res": set()}    # COUNT_SHARED == "run"
+
+def seen_sets(page:dict) -> tuple[set,set]:
+    """Dedupe scope for linked pages according to COUNT_SHARED."""
+    if COUNT_SHARED == "run":  return RUN_SEEN["snap"], RUN_SEEN["res"]
+    if COUNT_SHARED == "page": return page["snap"], page["res"]
+    return set(), set()
+
+# ─── linked pages: memo → page cache → browser ───────────────────────
+STATIC_MISS:set[str] = set()
+
+def snapshot_html(d, href:str) -> str:
+    if FAST_HTTP and href not in STATIC_MISS and (html := static_select(href, DRAWER_CSS)):
+        return html
+    d.get(href); WebDriverWait(d, WAIT).until(READY)
+    open_all_accordions(d)
+    html = drawer_html(d)
+    d.back(); WebDriverWait(d, WAIT).until(lambda drv: drv.current_url != href); settle(d, "snapshot-back", SLOW)
+    return html
+
+def resource_html(d, href:str) -> str:
+    if FAST_HTTP and href not in STATIC_MISS and (html := static_select(href, RESOURCE_CSS)):
+        return html
+    home = d.current_window_handle
+    browser.open_tab(d, href)
+    WebDriverWait(d, WAIT).until(READY)
+
+    html = ""
     with contextlib.suppress(NoSuchElementException):
-        sec = body.find_element(By.CSS_SELECTOR, css)
-        return {a.get_attribute("href"):
-                (a.text.strip() or a.get_attribute("title")
-                 or urlparse(a.get_attribute('href')).path.split('/')[-1])
-                for a in sec.find_elements(By.CSS_SELECTOR,"a[href*='resources']")}
-    return {}
-
-# ─── card handler (unchanged) ────────────────────────────────────────
-def handle_card(d, card, code_a,
-                seen_snaps:set, seen_res:set) -> tuple[int,list[PDFLine]]:
+        html = d.find_element(By.CSS_SELECTOR, RESOURCE_CSS).get_attribute("outerHTML")
+
+    if not html:
+        html = d.find_element(By.TAG_NAME,"body").get_attribute("outerHTML")
+
+    browser.close_tab(d, home); settle(d, "resource-close", SLOW)
+    return html
+
+CSS_OF = {"drawer": DRAWER_CSS, "snapshot": DRAWER_CSS, "resource": RESOURCE_CSS}
+
+def prefetch(keys, pre:dict):
+    """Concurrently GET every (kind, href) not yet memoised / cached / in pre.
+
+    Bodies land in the page cache – or in pre when the cache is off, which
+    drawer_url() / linked() pop – so the sequential loop in handle_card()
+    only pays for pages that need the browser fallback.
+    """
+    if not FAST_HTTP: return
+    kinds = {h: k for k, h in keys
+             if (k, h) not in pre and MEMO.get(f"{k}:{h}") is None and CACHE.get(h, k) is None}
+    got = fetch_many(kinds, {h: CSS_OF[k] for h, k in kinds.items()})
+    for href, html in got.items():                  # failed fetches are absent
+        if not html:       STATIC_MISS.add(href)     # answered, no target → browser later
+        elif CACHE.enabled: CACHE.put(href, html, kinds[href])
+        else:              pre[(kinds[href], href)] = html
+
+def linked(d, kind:str, href:str, fetch, pre:dict) -> tuple[list[PDFLine],int]:
+    key = f"{kind}:{href}"
+    memo = MEMO.get(key)
+    if memo: return memo
+
+    with spans.span(f"linked:{kind}"):
+        html = pre.pop((kind, href), None) or (CACHE.get(href, kind) or {}).get("html")
+        if not html:
+            html = fetch(d, href); CACHE.put(href, html, kind)
+    with spans.span("parse"):
+        return MEMO.put(key, *lines_and_words(html, indent=INDENT))      # one parse
+
+# ─── card handler ────────────────────────────────────────────────────
+def handle_card(d, card:dict, seen_snaps:set, seen_res:set,
+                arch:Archive|None=None, pre:dict|None=None) -> tuple[int,list[PDFLine]]:
+    """card: one entry of section_cards(); pre: bodies prefetched with the cache off."""
+    pre = {} if pre is None else pre
     out:list[PDFLine] = []
-    code = code_a.text or "(no-code)"
+    code = card["code"] or "(no-code)"
     out.append((code, "Helvetica-Bold", 14, 0))
 
-    out.extend(html_to_lines(card.get_attribute("innerHTML")))
-    inc = words(card.text)
+    with spans.span("parse"):
+        out.extend(html_to_lines(card["html"]))
+    inc = words(card["text"])
 
-    list_url = d.current_url
-    safe_click(d, code_a)
-    WebDriverWait(d, WAIT).until(lambda drv: drv.current_url != list_url)
+    with spans.span("drawer"):
+        drw = drawer_url(d, card, pre) if DRAWER_MODE == "url" else drawer_click(d, card)
+    with spans.span("parse"):
+        out.extend(html_to_lines(drw["html"]))
+    inc += words(drw["text"])
+    rec = {"code": code, "href": card["href"], "card": card["html"], "drawer": drw["html"],
+           "words": inc, "snapshots": [], "resources": []}
 
-    open_all_accordions(d)
-    out.extend(html_to_lines(drawer_html(d)))
-    inc += words(drawer_body(d).text)
+    snaps, res = dict(drw["snaps"]), dict(drw["res"])
+    if DRAWER_MODE != "url":            # url mode prefetched the whole page's links
+        prefetch([("snapshot", h) for h in snaps if h not in seen_snaps] +
+                 [("resource", h) for h in res if h not in seen_res], pre)
 
     # snapshots ───────────────────────────
-    for href, lbl in snapshot_links(d).items():
+    for href, lbl in snaps.items():
         if href in seen_snaps: continue
         seen_snaps.add(href)
 
-        d.get(href); WebDriverWait(d, WAIT).until(READY)
-        open_all_accordions(d)
-
-        root_html = drawer_html(d)
+        blk, wc = linked(d, "snapshot", href, snapshot_html, pre)
+        rec["snapshots"].append([href, lbl])
         out.append((f"Snapshot – {lbl}", "Helvetica-Bold", 12, 0))
-        out.extend(html_to_lines(root_html, indent=INDENT))
-        inc += words(BeautifulSoup(root_html, "lxml").get_text(" ", strip=True))
-
-        d.back(); WebDriverWait(d, WAIT).until(lambda drv: drv.current_url != href); time.sleep(SLOW)
+        out.extend(blk); inc += wc
 
     # resources ───────────────────────────
-    for href, lbl in resource_links(d).items():
+    for href, lbl in res.items():
         if href in seen_res: continue
         seen_res.add(href)
 
-        d.execute_script("window.open(arguments[0])", href)
-        d.switch_to.window(d.window_handles[-1])
-        WebDriverWait(d, WAIT).until(READY)
-
-        res_html = ""
-        with contextlib.suppress(NoSuchElementException):
-            res_html = d.find_element(
-                By.CSS_SELECTOR,
-                "div[id^='container-'] div.container.responsivegrid.cmp-container--spacing-small"
-            ).get_attribute("outerHTML")
-
-        if not res_html:
-            res_html = d.find_element(By.TAG_NAME,"body").get_attribute("outerHTML")
-
+        blk, wc = linked(d, "resource", href, resource_html, pre)
+        rec["resources"].append([href, lbl])
         out.append((f"Resource – {lbl}", "Helvetica-Bold", 12, 0))
-        out.extend(html_to_lines(res_html, indent=INDENT))
-        inc += words(BeautifulSoup(res_html,"lxml").get_text(" ", strip=True))
-
-        d.close(); d.switch_to.window(d.window_handles[0]); time.sleep(SLOW)
+        out.extend(blk); inc += wc
 
-    d.back(); WebDriverWait(d, WAIT).until(lambda drv: drv.current_url == list_url); time.sleep(SLOW)
+    if arch is not None: arch.append(rec)
     return inc, out
 
-# ─── crawl whole page (driver passed-in) ────────────────────────────
-def crawl(d, url:str, subj:str, yr:str) -> int:
-    lines:list[PDFLine]=[]; grand=0
-    d.get("about:blank")                # cheap reset
-    d.get(url); WebDriverWait(d,25).until(READY)
-
-    with contextlib.suppress(TimeoutException):
-        safe_click(d, WebDriverWait(d,4).until(EC.element_to_be_clickable((
-            By.XPATH,"//section[contains(@class,'SlideOut')]/div/button"))))
+# ─── raw-HTML archive for offline_extract.py ─────────────────────────
+def archive_path(subj:str, yr:str) -> Path:
+    return ARCHIVE_DIR/f"{slug(subj)}__{slug(yr)}.json"
+
+class Archive:
+    """Cards in crawl order with the links they counted, streamed to disk
+    one card at a time; the linked pages' HTML itself stays in the page
+    cache.  Same JSON as a one-shot dump – only replaced on success."""
+    def __init__(self, url:str, subj:str, yr:str):
+        self.fh, self.n = None, 0
+        if ARCHIVE_DIR is None: return
+        self.path = archive_path(subj, yr); self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp  = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        self.fh   = self.tmp.open("w", encoding="utf-8")
+        self.fh.write(json.dumps({"url": url, "subject": subj, "year": yr})[:-1] + ', "cards": [')
+
+    def append(self, rec:dict):
+        if self.fh is None: return
+        self.fh.write(("," if self.n else "") + json.dumps(rec)); self.n += 1
+
+    def __enter__(self): return self
+
+    def __exit__(self, exc, *_):
+        if self.fh is None: return
+        self.fh.write("]}"); self.fh.close()
+        if exc: self.tmp.unlink(missing_ok=True)
+        else:   os.replace(self.tmp, self.path)
 
+# ─── crawl whole page (driver passed-in) ────────────────────────────
+def crawl(d, url:str, subj:str, yr:str, loaded:bool=False) -> int:
+    """loaded=True: url is already open with the slide-out closed (pipeline.py).
+
+    Each card's lines go straight to the PDF stream and its HTML to the
+    archive; see walk_page() for what url mode holds per page.
+    """
+    if not loaded:
+        with spans.span("nav"):
+            d.get("about:blank")                # cheap reset
+            d.get(url); WebDriverWait(d,25).until(READY)
+
+            with contextlib.suppress(TimeoutException):
+                safe_click(d, WebDriverWait(d,4).until(EC.element_to_be_clickable((
+                    By.XPATH,"//section[contains(@class,'SlideOut')]/div/button"))))
+
+    pdf = pdf_path(subj, yr)
+    with pdf_out.Stream(pdf, margin=MARGIN, line_sp=LINE_SP) as out, \
+         Archive(url, subj, yr) as arch:
+        walk_page(d, url, out, arch)
+    api_capture.drain(d, url, "drawers")
+    say(f"   PDF → {pdf}  ({out.wc} words)")
+    return out.wc
+
+def pdf_path(subj:str, yr:str) -> Path:
+    return stage_pdf("content", subj, yr, DATA_DIR)
+
+def walk_page(d, url:str, out:pdf_out.Stream, arch:Archive):
+    """url mode harvests every strand before the first drawer: a browser
+    fallback (drawer, snapshot) navigates away from the list page and
+    would lose the chip selection and scroll position mid-harvest.  The
+    harvest is spooled to a temp file (one JSON card record per line) and
+    read back card by card, so only hrefs and seen-sets stay in memory;
+    drawers and linked pages are still fetched one card at a time."""
     header = WebDriverWait(d,WAIT).until(EC.presence_of_element_located((
         By.CSS_SELECTOR,"main div.CurriculumView-sectionHeader div")))
 
@@ -238,8 +380,11 @@ def crawl(d, url:str, subj:str, yr:str) -> int:
         det = header.find_element(By.XPATH,
             ".//label[.//span[normalize-space()='Detailed view']]")
         if "is-checked" not in det.get_attribute("class"):
-            safe_click(d, det); time.sleep(.15)
+            safe_click(d, det); settle(d, "detailed-view", .15)
 
+    page_seen={"snap": set(), "res": set()}
+    strands, hrefs = [], []                   # url mode: (seen_snaps, seen_res) per strand
+    spool = tempfile.TemporaryFile("w+", encoding="utf-8")
     chips=[c for c in header.find_elements(By.CSS_SELECTOR,"label[data-value]")
            if c.text.strip() not in {"Simple view","Detailed view"}]
     checked=lambda: header.find_elements(By.CSS_SELECTOR,"label.is-checked[data-value]")
@@ -247,71 +392,144 @@ def crawl(d, url:str, subj:str, yr:str) -> int:
     for chip in chips:
         if chip not in checked():
             while len(checked())>=3:
-                safe_click(d, checked()[0]); time.sleep(.05)
-            safe_click(d, chip); time.sleep(.15)
+                safe_click(d, checked()[0]); settle(d, "chip-off", .05)
+            safe_click(d, chip); settle(d, "chip-on", .15)
 
         sid = re.sub(r"[^\w-]","-",chip.text.lower()).strip("-")
         try:
-            hdr = WebDriverWait(d,WAIT).until(EC.presence_of_element_located((
+            WebDriverWait(d,WAIT).until(EC.presence_of_element_located((
                 By.CSS_SELECTOR,f"header#{sid}")))
         except TimeoutException: continue
-        section = hdr.find_element(By.XPATH,"./ancestor::section[1]")
-        seen_codes=set(); seen_snaps=set(); seen_res=set()
-
-        def refresh():
-            h2=d.find_element(By.CSS_SELECTOR,f"header#{sid}")
-            return h2.find_element(By.XPATH,"./ancestor::section[1]")
+        seen_codes=set(); seen_snaps, seen_res = seen_sets(page_seen)
+        strands.append((seen_snaps, seen_res))
 
         while True:
-            for card in section.find_elements(By.CSS_SELECTOR,".ContentDescription"):
-                try:
-                    code_a = card.find_element(By.CSS_SELECTOR,"a.ContentDescription-code")
-                    code   = code_a.text or "(no-code)"
-                except NoSuchElementException: continue
+            for card in section_cards(d, sid, seen_codes):   # one round trip per scroll step
+                code = card["code"] or "(no-code)"
                 if code in seen_codes: continue
                 seen_codes.add(code)
 
-                inc, blk = handle_card(d, card, code_a, seen_snaps, seen_res)
-                grand += inc; lines.extend(blk)
-                section = refresh()
+                if DRAWER_MODE == "url":
+                    card.pop("a", None); hrefs.append(card["href"])
+                    spool.write(json.dumps([len(strands)-1, card]) + "\n"); continue
+                with spans.span("card", code=code):
+                    _, blk = handle_card(d, card, seen_snaps, seen_res, arch)
+                out.add(blk)
 
             if not win_scroll(d): break
 
-    pdf = DATA_DIR/slug(subj)/slug(yr)/PDF_NAME.format(s=subj, y=yr)
-    wc = save_pdf(lines, pdf)
-    say(f"   PDF → {pdf}  ({wc} words)")
-    return wc
+    api_capture.drain(d, url, "cards")
+    # url mode: the list page is no longer needed – visit drawers directly,
+    # after one batch for every drawer and one for all the links they hold
+    pre:dict = {}
+    prefetch([("drawer", h) for h in hrefs], pre)
+    prefetch(page_links(hrefs, pre), pre)
+    with spool:
+        spool.seek(0)
+        for ln in spool:
+            k, card = json.loads(ln)
+            with spans.span("card", code=card["code"]):
+                _, blk = handle_card(d, card, *strands[k], arch, pre)
+            out.add(blk)
+
+def page_links(hrefs, pre:dict) -> dict:
+    """(kind, href) of every snapshot / resource in the drawers fetched so far."""
+    keys = {}
+    for h in hrefs:
+        html = pre.get(("drawer", h)) or (CACHE.get(h, "drawer") or {}).get("html")
+        if not html: continue                       # browser fallback later, per card
+        drw = drawer_parse(html, h)
+        keys.update({("snapshot", s): 1 for s, _ in drw["snaps"]})
+        keys.update({("resource", r): 1 for r, _ in drw["res"]})
+    return keys
 
 # ─── run batch ───────────────────────────────────────────────────────
-def main():
+def run_row(sup:Supervised, df, idx:int):
+    row = df.loc[idx]
+    url = row.get("URL") or row.get("Link")
+    if not isinstance(url, str) or not url.startswith("http"):
+        say(f"[skip] row {idx}: bad URL"); return
+    try:
+        with spans.row("content", row["Subject"], row["Year"], url=url):
+            wc = sup.run(crawl, url, row["Subject"], row["Year"])
+        STORE.upsert(row["Subject"], row["Year"], NEW_COL, wc); MEMO.save()
+        STORE.record_attempt(row["Subject"], row["Year"], NEW_COL)
+        say(f"[ok] row {idx}: {row['Subject']} {row['Year']} → {wc}")
+    except Exception as e:
+        STORE.record_attempt(row["Subject"], row["Year"], NEW_COL, e.__class__.__name__)
+        say(f"[ERR] row {idx}: {e.__class__.__name__}")
+        traceback.print_exc(limit=1)
+
+def worker(df, todo:queue.Queue):
+    sup = Supervised(start_driver)
+    try:
+        while True:
+            try:
+                idx = todo.get_nowait()
+            except queue.Empty:
+                return
+            run_row(sup, df, idx)
+    finally:
+        sup.quit()
+
+# ─── incremental planning ────────────────────────────────────────────
+def archived_links(subj:str, yr:str) -> list[tuple[str,str]]:
+    """(href, kind) of every drawer and linked page the row last counted."""
+    p = archive_path(subj, yr)
+    if not p.exists(): return []
+    cards = json.loads(p.read_text("utf-8"))["cards"]
+    return [(c["href"], "drawer") for c in cards if c.get("href")] + \
+           [(href, kind) for c in cards
+            for kind, key in (("snapshot","snapshots"), ("resource","resources"))
+            for href, _ in c[key]]
+
+def refresh_link(href:str, kind:str):
+    """Conditional GET; a changed drawer / linked page is evicted from memo + cache."""
+    known = FP.get(href, kind) is not None
+    if FP.probe(href, kind) and known:
+        MEMO.drop(f"{kind}:{href}"); CACHE.drop(href, kind)
+
+def changed_rows(df, rows:list[int]) -> list[int]:
+    links = {i: archived_links(df.at[i,"Subject"], df.at[i,"Year"]) for i in rows}
+    with ThreadPoolExecutor(8) as ex:
+        list(ex.map(lambda hk: refresh_link(*hk), {hk for v in links.values() for hk in v}))
+    return [i for i in rows
+            if FP.stale([(df.at[i,"URL"], "page"), *links[i]],
+                        STORE.updated(df.at[i,"Subject"], df.at[i,"Year"], NEW_COL))]
+
+def main(argv=None):
+    parse_cli(sys.argv if argv is None else argv)
     if not CSV_FILE.exists():
         say("CSV missing"); sys.exit(1)
     df = pd.read_csv(CSV_FILE, dtype=str)
-    if NEW_COL not in df.columns:
-        df[NEW_COL] = ""
 
     start = max(0, RUN_FROM)
     end   = min(len(df)-1, RUN_TO)
     if start > end:
         say(f"Nothing to do: RUN_FROM({RUN_FROM}) > RUN_TO({RUN_TO})"); return
 
-    driver = start_driver()
+    rows = list(range(start, end+1))
+    if INCREMENTAL:
+        rows = changed_rows(df, rows)
+        say(f"Incremental: {len(rows)} of {end-start+1} rows changed since last count")
+        MEMO.save()
+    else:
+        rows = plan(df, rows, NEW_COL, pdf_path)
+    if not rows: return
+    todo:queue.Queue = queue.Queue()
+    for idx in rows:
+        todo.put(idx)
+
+    n = max(1, min(WORKERS, len(rows)))
+    say(f"{len(rows)} of rows {start}..{end} on {n} worker(s)")
+    pool = [threading.Thread(target=worker, args=(df, todo), name=f"w{i}")
+            for i in range(n)]
     try:
-        for idx in range(start, end+1):
-            row = df.loc[idx]
-            url = row.get("URL") or row.get("Link")
-            if not url or not url.startswith("http"):
-                say(f"[skip] row {idx}: bad URL"); continue
-            try:
-                wc = crawl(driver, url, row["Subject"], row["Year"])
-                df.at[idx, NEW_COL] = wc
-                df.to_csv(CSV_FILE, index=False)
-                say(f"[ok] row {idx}: {row['Subject']} {row['Year']} → {wc}")
-            except Exception as e:
-                say(f"[ERR] row {idx}: {e.__class__.__name__}")
-                traceback.print_exc(limit=1)
+        for t in pool: t.start()
+        for t in pool: t.join()
     finally:
-        driver.quit()
+        pdf_out.flush()
+        say(f"{STORE.export(CSV_FILE, (NEW_COL,))} cells exported → {CSV_FILE}")
 
     say("\nFinished requested rows.")
 
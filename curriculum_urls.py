@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+curriculum_urls.py
+──────────────────
+The learning-area URL pattern the F-10 widget submits to
+
+    https://v9.australiancurriculum.edu.au/f-10-curriculum/learning-areas/
+        <area>/<year>?view=quick&detailed-content-descriptions=0&…
+
+Once one (subject, year) pair has been resolved through the widget, the
+<area> slug is known and every other year of that subject can be built
+directly, then checked with a cheap HEAD request instead of widget clicks.
+"""
+
+from __future__ import annotations
+import re
+import requests
+from http_fetch import session
+
+BASE  = "https://v9.australiancurriculum.edu.au/f-10-curriculum/learning-areas"
+QUERY = ("view=quick&detailed-content-descriptions=0&hide-ccp=0&hide-gc=0"
+         "&side-by-side=1&strands-start-index=0")
+
+YEAR_SLUG = {
+    "foundationYear": "foundation-year", "year1": "year-1", "year2": "year-2",
+    "year3": "year-3", "year4": "year-4", "year5": "year-5", "year6": "year-6",
+    "year7": "year-7", "year8": "year-8", "year9": "year-9", "year10": "year-10",
+}
+AREA_RE = re.compile(r"/learning-areas/([^/?#]+)/[^/?#]+")
+
+def area_of(url:str|None) -> str|None:
+    m = AREA_RE.search(url or "")
+    return m.group(1) if m else None
+
+def pair_url(area:str, year_code:str) -> str:
+    return f"{BASE}/{area}/{YEAR_SLUG[year_code]}?{QUERY}"
+
+def url_live(url:str, timeout:float=10) -> bool:
+    """Lightweight existence check (HEAD, GET if HEAD isn't allowed)."""
+    try:
+        r = session().head(url, timeout=timeout, allow_redirects=True)
+        if r.status_code == 405:
+            r = session().get(url, timeout=timeout, stream=True); r.close()
+    except requests.RequestException:
+        return False
+    return r.status_code < 400
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+extractors.py
+─────────────
+Browser-free HTML → PDF-line extraction shared by the three extractors
+and by offline_extract.py
+
+• html_to_lines()              – content-description cards / drawers / links
+• extract_lines()              – "Understanding of the learning area" page
+• extract_desc_ach(), lines_from() – level description + achievement standard
+
+Every function takes an HTML string and returns a list of line tuples
+(text, font, size[, indent]); nothing here touches Selenium.
+
+Two backends with identical output, picked by EXTRACT_BACKEND:
+• "lxml" (default) – compiled parser + XPath, one parse per document;
+  lines_and_words() returns the lines and the word count from that parse
+• "bs4"            – the original BeautifulSoup walkers, kept as reference
+
+    python extractors.py bench [N]    # both backends over the archive /
+                                      # page cache: parity check + timings
+"""
+
+from __future__ import annotations
+import os, re, sys, time, textwrap
+from bs4 import BeautifulSoup, Tag, element as bs4
+from lxml import etree, html as lxml_html
+
+BACKEND = os.environ.get("EXTRACT_BACKEND", "lxml")     # lxml | bs4
+
+WORD_RE = re.compile(r"\b[\w'-]+\b", re.UNICODE)
+words   = lambda t: len(WORD_RE.findall(t or ""))
+
+# ─── content description (cards, drawers, snapshots, resources) ──────
+PDFLine = tuple[str, str, int, int]
+
+FONTS   = {"h1":16, "h2":14, "h3":12, "h4":12, "h5":11, "h6":11}
+WRAP    = 100
+INDENT  = 15
+
+def wrap(txt:str, width:int):
+    for seg in textwrap.wrap(txt, width) or [""]:
+        yield seg
+
+STRIP = {"script","style","noscript","svg","header","footer","nav","button"}
+
+def clean(tag:Tag):
+    for t in tag.find_all(lambda x:isinstance(x,Tag) and x.name in STRIP):
+        t.decompose()
+
+def walk(node:Tag, indent:int, out:list[PDFLine]):
+    if isinstance(node, str): return
+    for child in node.children:
+        if isinstance(child, str): continue
+        nm = child.name.lower()
+        if nm in FONTS:
+            for seg in wrap(child.get_text(" ", strip=True), WRAP):
+                out.append((seg, "Helvetica-Bold", FONTS[nm], indent))
+        elif nm == "p":
+            for seg in wrap(child.get_text(" ", strip=True), WRAP):
+                out.append((seg, "Helvetica", 10, indent))
+        elif nm in {"ul","ol"}:
+            for li in child.find_all("li", recursive=False):
+                for seg in wrap("• "+li.get_text(" ", strip=True), WRAP):
+                    out.append((seg, "Helvetica", 10, indent))
+                for sub in li.find_all(["ul","ol"], recursive=False):
+                    walk(sub, indent+INDENT, out)
+        else:
+            walk(child, indent, out)
+
+def bs_html_to_lines(html:str, indent:int=0):
+    soup = BeautifulSoup(html, "lxml"); clean(soup)
+    out:list[PDFLine]=[]; walk(soup.body or soup, indent, out); return out
+
+def bs_html_words(html:str) -> int:
+    return words(BeautifulSoup(html, "lxml").get_text(" ", strip=True))
+
+# ─── shared hidden-node cleaner ──────────────────────────────────────
+def _clean_hidden(n, drop):
+    for t in n(drop): t.decompose()
+    for t in n.find_all(lambda x:isinstance(x,bs4.Tag) and (
+            x.get("aria-hidden")=="true" or "display:none" in (x.get("style") or ""))):
+        t.decompose()
+
+# ─── understanding of the learning area ─────────────────────────────
+LA_BASE_PT = 10
+LA_FONT = {
+    "h1": ("Helvetica-Bold",18), "h2": ("Helvetica-Bold",16),
+    "h3": ("Helvetica-Bold",14), "h4": ("Helvetica-Bold",12),
+    "h5": ("Helvetica-Bold",11), "h6": ("Helvetica-Bold",10),
+}
+LA_DEF_FONT = ("Helvetica", LA_BASE_PT); LA_BULLET = ("Helvetica-Bold", LA_BASE_PT)
+
+def _yield(main):
+    for t in main.descendants:
+        if isinstance(t,bs4.Tag) and t.name in {"h1","h2","h3","h4","h5","h6","p","li","blockquote"}:
+            txt=" ".join(t.get_text(" ",strip=True).split())
+            if txt: yield t.name, txt
+
+def bs_extract_lines(html):
+    soup=BeautifulSoup(html,"lxml")
+    main=soup.select_one("#main-content")
+    _clean_hidden(main, ["script","style","noscript","iframe","nav"])
+    lines=[]
+    title=soup.select_one("header[id^='title-'] h1")
+    if title: lines.append((title.text.strip(), *LA_FONT["h1"]))
+    for h in main.find_all(["h2","h3","h4","h5","h6"]):
+        if h.text.strip().lower().startswith("resources"):
+            for x in list(h.find_all_next()): x.decompose(); h.decompose(); break
+    for tag,txt in _yield(main):
+        lines.append(("• "+txt,*LA_BULLET) if tag=="li" else (txt,*LA_FONT.get(tag,LA_DEF_FONT)))
+    return lines
+
+# ─── level description + achievement standard ───────────────────────
+DA_WRAP       = 90
+HEADING_FONT  = ("Helvetica-Bold", 16)
+BODY_FONT     = ("Helvetica", 10)
+BULLET_FONT   = ("Helvetica-Bold", 10)
+TRAIL_RE = re.compile(r",\s*(?:collapse|expand)\s+this\s+section\b.*", re.I)
+
+def year_variants(label: str) -> list[str]:
+    lbl = label.lower().strip()
+    if lbl.startswith("foundation"):
+        return ["foundation-year", "years-foundation-and-year-1"]
+
+    m = re.match(r"year\s*(\d+)", lbl)
+    if not m:
+        return [lbl.replace(" ", "-")]
+
+    n = int(m.group(1))
+    out = [f"year-{n}"]
+    if n > 0:  out.append(f"years-{n-1}-and-{n}")
+    if n < 10: out.append(f"years-{n}-and-{n+1}")
+    return out
+
+def desc_ach_selectors(suffix: str) -> tuple[str, str]:
+    return f"#level-description\\:--{suffix}", f"#achievement-standard\\:--{suffix}"
+
+def bs_extract_desc_ach(html: str, level_sel: str, ach_sel: str):
+    soup = BeautifulSoup(html, "lxml")
+    blocks = []
+    for sel in (level_sel, ach_sel):
+        hdr  = soup.select_one(f"{sel} > header > button")
+        body = soup.select_one(f"{sel} > div")
+        if not (hdr and body): continue
+        heading = TRAIL_RE.sub("", hdr.get_text(" ", strip=True))
+        _clean_hidden(body, ["script","style","noscript","iframe"])
+        paras_and_lis = body.select("p, li")  # ← lists captured
+        blocks.append((heading, paras_and_lis))
+
+    return _da_lines([(h, [(n.name, n.get_text(" ", strip=True)) for n in nodes])
+                      for h, nodes in blocks])
+
+def _da_lines(blocks):
+    """blocks: [(heading, [(tag, text), …]), …] → wrapped PDF lines."""
+    lines = []
+    for heading, nodes in blocks:
+        lines.append((heading, *HEADING_FONT))
+        for name, txt in nodes:
+            txt = " ".join(txt.split())
+            if not txt: continue
+            if name == "li":
+                txt = "• " + txt
+                font = BULLET_FONT
+            else:
+                font = BODY_FONT
+            for ln in textwrap.wrap(txt, DA_WRAP) or [""]:
+                lines.append((ln, *font))
+    return lines
+
+# ─── lxml backend ────────────────────────────────────────────────────
+# Same rules as above on an lxml tree.  bs4's get_text() skips comments
+# and <script>/<style>/<template> strings; TEXT does the same.
+TEXT  = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]",
+                    smart_strings=False)
+BY_ID = etree.XPath("//*[@id=$id]")
+ID_ELS = etree.XPath("//*[@id]")
+HIDDEN = etree.XPath(".//*[@aria-hidden='true' or contains(@style,'display:none')]")
+_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+def parse(html:str):
+    try:
+        return lxml_html.document_fromstring(html.encode("utf-8"), parser=_PARSER)
+    except etree.ParserError:               # empty / whitespace-only
+        return lxml_html.document_fromstring("<html><body></body></html>")
+
+def text_of(el, sep:str=" ") -> str:
+    """bs4 el.get_text(sep, strip=True)."""
+    return sep.join(t for s in TEXT(el) if (t := s.strip()))
+
+def _drop(els):
+    for el in els:
+        if el.getparent() is not None: el.drop_tree()     # keeps the tail
+
+def _lx_walk(node, indent:int, out:list[PDFLine]):
+    for child in node:
+        nm = child.tag
+        if not isinstance(nm, str): continue
+        if nm in FONTS:
+            for seg in wrap(text_of(child), WRAP):
+                out.append((seg, "Helvetica-Bold", FONTS[nm], indent))
+        elif nm == "p":
+            for seg in wrap(text_of(child), WRAP):
+                out.append((seg, "Helvetica", 10, indent))
+        elif nm in {"ul","ol"}:
+            for li in child:
+                if li.tag != "li": continue
+                for seg in wrap("• "+text_of(li), WRAP):
+                    out.append((seg, "Helvetica", 10, indent))
+                for sub in li:
+                    if sub.tag in ("ul","ol"): _lx_walk(sub, indent+INDENT, out)
+        else:
+            _lx_walk(child, indent, out)
+
+def lx_lines_and_words(html:str, indent:int=0):
+    root = parse(html)
+    wc = words(text_of(root))               # before cleaning, like html_words()
+    etree.strip_elements(root, *STRIP, with_tail=False)
+    out:list[PDFLine]=[]; body = root.find("body")
+    _lx_walk(root if body is None else body, indent, out)
+    return out, wc
+
+def lx_html_to_lines(html:str, indent:int=0):
+    return lx_lines_and_words(html, indent)[0]
+
+def lx_html_words(html:str) -> int:
+    return words(text_of(parse(html)))
+
+def _lx_clean_hidden(n, drop):
+    etree.strip_elements(n, *drop, with_tail=False)
+    _drop(HIDDEN(n))
+
+def lx_extract_lines(html):
+    root=parse(html)
+    main=(BY_ID(root, id="main-content") or [None])[0]
+    _lx_clean_hidden(main, ["script","style","noscript","iframe","nav"])
+    lines=[]
+    title=root.xpath("//header[starts-with(@id,'title-')]//h1")
+    if title: lines.append(("".join(TEXT(title[0])).strip(), *LA_FONT["h1"]))
+    for h in main.xpath(".//h2|.//h3|.//h4|.//h5|.//h6"):
+        if h.getroottree().getroot() is not root: continue          # already removed
+        if "".join(TEXT(h)).strip().lower().startswith("resources"):
+            # bs4 path: the first tag after h in document order goes with it
+            nxt = next(h.iterdescendants(etree.Element), None)
+            if nxt is None: nxt = (h.xpath("following::*[1]") or [None])[0]
+            _drop([x for x in (nxt, h) if x is not None])
+    for t in main.iter("h1","h2","h3","h4","h5","h6","p","li","blockquote"):
+        txt=" ".join(text_of(t).split())
+        if txt: lines.append(("• "+txt,*LA_BULLET) if t.tag=="li" else (txt,*LA_FONT.get(t.tag,LA_DEF_FONT)))
+    return lines
+
+def id_index(root) -> dict:
+    """id → first element carrying it (one pass instead of a scan per lookup)."""
+    return {e.get("id"): e for e in reversed(ID_ELS(root))}
+
+def _lx_desc_ach(ids:dict, level_sel:str, ach_sel:str):
+    blocks = []
+    for sel in (level_sel, ach_sel):
+        box  = ids.get(sel[1:].replace("\\", ""))
+        hdr  = box.xpath("./header/button") if box is not None else []
+        body = box.xpath("./div") if box is not None else []
+        if not (hdr and body): continue
+        heading = TRAIL_RE.sub("", text_of(hdr[0]))
+        _lx_clean_hidden(body[0], ["script","style","noscript","iframe"])
+        blocks.append((heading, body[0].xpath(".//p|.//li")))
+    return _da_lines([(h, [(n.tag, text_of(n)) for n in nodes]) for h, nodes in blocks])
+
+def lx_extract_desc_ach(html: str, level_sel: str, ach_sel: str):
+    return _lx_desc_ach(id_index(parse(html)), level_sel, ach_sel)
+
+# ─── backend selection ───────────────────────────────────────────────
+def bs_lines_and_words(html:str, indent:int=0):
+    return bs_html_to_lines(html, indent), bs_html_words(html)
+
+BACKENDS = {
+    "lxml": (lx_html_to_lines, lx_html_words, lx_lines_and_words, lx_extract_lines, lx_extract_desc_ach),
+    "bs4":  (bs_html_to_lines, bs_html_words, bs_lines_and_words, bs_extract_lines, bs_extract_desc_ach),
+}
+html_to_lines, html_words, lines_and_words, extract_lines, extract_desc_ach = BACKENDS[BACKEND]
+
+def lines_from(html: str, yr: str, backend:str|None=None):
+    """First year-suffix variant that yields lines, else []."""
+    ids = id_index(parse(html)) if (backend or BACKEND) == "lxml" else None   # parse once
+    for suffix in year_variants(yr):
+        sels = desc_ach_selectors(suffix)
+        lines = _lx_desc_ach(ids, *sels) if ids is not None else bs_extract_desc_ach(html, *sels)
+        if lines: return lines
+    return []
+
+# ─── benchmark ───────────────────────────────────────────────────────
+DA_YEARS = ["Foundation Year"] + [f"Year {n}" for n in range(1, 11)]
+
+def corpus(n:int):
+    """(fragments, learning-area pages, row pages) from archive/ + page cache."""
+    import gzip, json
+    from pathlib import Path
+    from page_cache import CACHE_DIR
+    frag, la, da = [], [], []
+    for p in sorted(Path("archive").glob("*.json"))[:n]:
+        for c in json.loads(p.read_text("utf-8"))["cards"]:
+            frag += [c["card"], c["drawer"]]
+    bucket = {"snapshot": frag, "resource": frag, "drawer": frag, "expanded": la, "desc-ach": da}
+    for p in sorted(CACHE_DIR.glob("*/*.json.gz")):
+        with gzip.open(p, "rt", encoding="utf-8") as fh:
+            e = json.load(fh)
+        if e["state"] in bucket and len(bucket[e["state"]]) < 50*n:
+            bucket[e["state"]].append(e["html"])
+    return frag, la[:n], da[:n]
+
+def bench(n:int=50):
+    frag, la, da = corpus(n)
+    jobs = {
+        "lines+words":   (frag, {"bs4":  lambda h: bs_lines_and_words(h, INDENT),
+                                 "lxml": lambda h: lx_lines_and_words(h, INDENT)}),
+        "understanding": (la,   {"bs4": bs_extract_lines, "lxml": lx_extract_lines}),
+        "desc-ach":      (da,   {be: (lambda h, be=be: [lines_from(h, y, be) for y in DA_YEARS])
+                                 for be in BACKENDS}),
+    }
+    print(f"{'job':14} {'docs':>5} {'bs4 s':>8} {'lxml s':>8} {'speed-up':>9} {'diffs':>6}")
+    for name, (docs, fns) in jobs.items():
+        if not docs: continue
+        res, secs = {}, {}
+        for be, fn in fns.items():
+            t = time.perf_counter(); res[be] = [fn(h) for h in docs]
+            secs[be] = time.perf_counter() - t
+        diffs = sum(a != b for a, b in zip(res["bs4"], res["lxml"]))
+        print(f"{name:14} {len(docs):5} {secs['bs4']:8.2f} {secs['lxml']:8.2f} "
+              f"{secs['bs4']/max(secs['lxml'],1e-9):8.1f}x {diffs:6}")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["bench"]:
+        bench(int(sys.argv[2]) if len(sys.argv) > 2 else 50)
+    else:
+        print(__doc__)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+fingerprints.py
+───────────────
+Change detection for incremental re-crawls
+
+• one record per (url, kind): content hash of the visible text, ETag /
+  Last-Modified validators, when it was last checked and last *changed*
+• observe() after every real fetch/render → True if the content moved
+• probe() refreshes linked pages with conditional GETs (304 = unchanged)
+• a row needs re-extraction only if one of its inputs changed after its
+  result was written (results_store.updated) – see stale()
+
+Records live next to the results in results.sqlite.
+"""
+
+from __future__ import annotations
+import os, time, sqlite3, hashlib, threading
+from pathlib import Path
+from page_cache import canonical
+from extractors import parse, text_of
+
+DB_FILE     = Path(os.environ.get("RESULTS_DB", "results.sqlite"))
+INCREMENTAL = os.environ.get("INCREMENTAL", "0") == "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    url     TEXT NOT NULL,
+    kind    TEXT NOT NULL,
+    hash    TEXT NOT NULL,
+    etag    TEXT,
+    lastmod TEXT,
+    checked REAL NOT NULL,
+    changed REAL NOT NULL,
+    PRIMARY KEY (url, kind)
+)"""
+
+def digest(html:str) -> str:
+    """Hash of the visible text only – React ids / attribute churn don't count."""
+    txt = " ".join(text_of(parse(html or "")).split())
+    return hashlib.sha256(txt.encode()).hexdigest()
+
+class Fingerprints:
+    def __init__(self, path:Path=DB_FILE):
+        self.path, self._local = Path(path), threading.local()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(SCHEMA)
+            self._local.con = con
+        return con
+
+    def get(self, url:str, kind:str) -> dict|None:
+        cur = self.db.execute("SELECT hash, etag, lastmod, checked, changed FROM fingerprints "
+                              "WHERE url=? AND kind=?", (canonical(url), kind))
+        row = cur.fetchone()
+        return dict(zip(("hash", "etag", "lastmod", "checked", "changed"), row)) if row else None
+
+    def observe(self, url:str, kind:str, html:str,
+                etag:str|None=None, lastmod:str|None=None) -> bool:
+        """Record a fresh copy; True if it is new or its content changed."""
+        h, now, old = digest(html), time.time(), self.get(url, kind)
+        moved = old is None or old["hash"] != h
+        self.db.execute(
+            "INSERT INTO fingerprints VALUES (?,?,?,?,?,?,?) "
+            "ON CONFLICT(url,kind) DO UPDATE SET hash=excluded.hash, etag=excluded.etag, "
+            "lastmod=excluded.lastmod, checked=excluded.checked, changed=excluded.changed",
+            (canonical(url), kind, h, etag, lastmod, now, now if moved else old["changed"]))
+        return moved
+
+    def touch(self, url:str, kind:str):
+        self.db.execute("UPDATE fingerprints SET checked=? WHERE url=? AND kind=?",
+                        (time.time(), canonical(url), kind))
+
+    def changed(self, url:str, kind:str) -> float|None:
+        fp = self.get(url, kind)
+        return fp["changed"] if fp else None
+
+    def stale(self, inputs, since:float|None) -> bool:
+        """inputs: [(url, kind), …]. True if never done or any input moved later."""
+        if since is None: return True
+        for url, kind in inputs:
+            t = self.changed(url, kind)
+            if t is None or t > since: return True
+        return False
+
+    # ── conditional HTTP refresh ────────────────────────────────────
+    def probe(self, url:str, kind:str) -> bool|None:
+        """Conditional GET; True new/changed, False unchanged, None unreachable.
+
+        Linked pages are only ever fingerprinted through probe() so the hash
+        always covers the same (static) document.
+        """
+        import requests
+        from http_fetch import session, TIMEOUT
+        fp, hdr = self.get(url, kind), {}
+        if fp and fp["etag"]:    hdr["If-None-Match"] = fp["etag"]
+        if fp and fp["lastmod"]: hdr["If-Modified-Since"] = fp["lastmod"]
+        try:
+            r = session().get(url, headers=hdr, timeout=TIMEOUT)
+        except requests.RequestException:
+            return None
+        if r.status_code == 304 and fp:
+            self.touch(url, kind); return False
+        if r.status_code != 200:
+            return None
+        return self.observe(url, kind, r.text, r.headers.get("ETag"),
+                            r.headers.get("Last-Modified"))
+
+FP = Fingerprints()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+http_fetch.py
+─────────────
+Plain-HTTP fast path for server-rendered curriculum pages
+
+• one pooled keep-alive requests.Session per thread (workers don't share);
+  fetch_all() runs on one module-level thread pool, so its sessions and
+  their connections live for the whole run
+• one retry layer: fetch_all() retries 429 / 5xx / network errors with
+  backoff behind the per-host gate; the adapter itself never retries
+• one HostGate per host for the whole process: static_select() and every
+  fetch_all() batch, from every worker thread, share its HOST_RATE
+• static_select() returns the outerHTML of a CSS target, or None when the
+  static HTML doesn't contain it → caller falls back to the browser
+• fetch_all() fans a set of URLs out concurrently (asyncio, bounded
+  concurrency, per-host rate limit, retry with exponential backoff);
+  css may be one selector or {url: selector}, so differently shaped
+  pages go out in one batch; a URL that never answered is left out of
+  the result, None means the page answered without the target
+"""
+
+from __future__ import annotations
+import time, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+# ─── tunables ────────────────────────────────────────────────────────
+TIMEOUT    = 15
+POOL       = 16
+CONCURRENCY = 8        # fetch_all(): requests in flight
+HOST_RATE  = 4.0       # fetch_all(): max requests / second / host
+RETRIES    = 3
+BACKOFF    = .5        # seconds, doubled per attempt
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/126.0 Safari/537.36")
+
+_local = threading.local()
+_pool  = ThreadPoolExecutor(CONCURRENCY, thread_name_prefix="http")
+
+def session() -> requests.Session:
+    s = getattr(_local, "s", None)
+    if s is None:
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL, pool_maxsize=POOL, max_retries=0)
+        s.mount("http://", adapter); s.mount("https://", adapter)
+        s.headers.update({"User-Agent": USER_AGENT,
+                          "Accept": "text/html,application/xhtml+xml"})
+        _local.s = s
+    return s
+
+def get_html(url:str, timeout:float=TIMEOUT) -> str|None:
+    """GET a page; None on network error, non-200 or non-HTML body."""
+    try:
+        r = session().get(url, timeout=timeout)
+    except requests.RequestException:
+        return None
+    if r.status_code != 200 or "html" not in r.headers.get("Content-Type", ""):
+        return None
+    return r.text
+
+def static_select(url:str, css:str) -> str|None:
+    """outerHTML of the first element matching css in the static page."""
+    time.sleep(gate(url).reserve())
+    html = get_html(url)
+    if not html: return None
+    el = BeautifulSoup(html, "lxml").select_one(css)
+    return str(el) if el and el.get_text(strip=True) else None
+
+# ─── async fan-out ───────────────────────────────────────────────────
+class HostGate:
+    """Spaces request starts to at most `rate` per second for one host."""
+    def __init__(self, rate:float):
+        self.gap, self.next = 1 / rate, 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Book the next start slot → seconds to wait for it (threads and loops)."""
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next); self.next = at + self.gap
+            return at - now
+
+_gates:dict[tuple[str,float],HostGate] = {}
+_gates_lock = threading.Lock()
+
+def gate(url:str, rate:float=HOST_RATE) -> HostGate:
+    key = (urlsplit(url).netloc, rate)
+    with _gates_lock:
+        g = _gates.get(key)
+        if g is None: g = _gates[key] = HostGate(rate)
+        return g
+
+FAILED = object()
+
+def _select(url:str, css:str|None) -> str|None:
+    """Blocking GET; raises on network errors / 429 / 5xx so we can retry."""
+    r = session().get(url, timeout=TIMEOUT)
+    if r.status_code == 429 or r.status_code >= 500:
+        r.raise_for_status()
+    if r.status_code != 200 or "html" not in r.headers.get("Content-Type", ""):
+        return None
+    if css is None:
+        return r.text
+    el = BeautifulSoup(r.text, "lxml").select_one(css)
+    return str(el) if el and el.get_text(strip=True) else None
+
+async def fetch_all(urls, css:str|dict|None=None, limit:int=CONCURRENCY,
+                    rate:float=HOST_RATE, retries:int=RETRIES) -> dict[str,str|None]:
+    """{url: html or css-target outerHTML or None} for the union of urls.
+
+    URLs that failed every attempt (network error, 429, 5xx) are omitted.
+    """
+    sem, loop = asyncio.Semaphore(limit), asyncio.get_running_loop()
+    sel = css.get if isinstance(css, dict) else (lambda _: css)
+
+    async def one(url):
+        g = gate(url, rate)
+        for attempt in range(retries + 1):
+            async with sem:
+                await asyncio.sleep(g.reserve())
+                try:
+                    return url, await loop.run_in_executor(_pool, _select, url, sel(url))
+                except requests.RequestException:
+                    pass
+            await asyncio.sleep(BACKOFF * 2 ** attempt)
+        return url, FAILED
+
+    got = await asyncio.gather(*(one(u) for u in set(urls)))
+    return {u: html for u, html in got if html is not FAILED}
+
+def fetch_many(urls, css:str|dict|None=None, **kw) -> dict[str,str|None]:
+    """Synchronous wrapper – safe to call from worker threads."""
+    urls = list(urls)
+    return asyncio.run(fetch_all(urls, css, **kw)) if urls else {}
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+link_memo.py
+────────────
+Process-wide memo of counted snapshot / resource pages: key → (lines, words)
+
+• key = "<kind>:<href>"; shared by every card, chip, row and worker of
+  the content-description extractor, replayed by offline_extract.py
+• persisted as an append-only JSONL journal – put/drop append one line,
+  save() only flushes, so a row costs the bytes it added instead of a
+  rewrite of the whole memo
+• entries older than TTL (the page cache's) read as misses; the journal
+  is compacted on load once superseded lines outnumber live entries
+• a legacy one-object .link_memo.json is imported on first load
+"""
+
+from __future__ import annotations
+import os, json, time, threading, contextlib
+from pathlib import Path
+from page_cache import TTL
+
+MEMO_FILE = Path(".link_memo.jsonl")
+LEGACY    = Path(".link_memo.json")
+
+def read(path:Path) -> tuple[dict[str,dict],int]:
+    """Replay a journal → ({key: {lines, words, ts}}, lines read)."""
+    data, n = {}, 0
+    if path.exists():
+        with path.open(encoding="utf-8") as fh:
+            for ln in fh:
+                try:
+                    rec = json.loads(ln); n += 1
+                except ValueError:
+                    continue                      # torn last line after a crash
+                key = rec.pop("key")
+                if rec.get("drop"): data.pop(key, None)
+                else:               data[key] = rec
+    elif path == MEMO_FILE and LEGACY.exists():
+        with contextlib.suppress(ValueError):
+            ts = LEGACY.stat().st_mtime
+            data = {k: {**v, "ts": ts} for k, v in json.loads(LEGACY.read_text("utf-8")).items()}
+            n = -1                                # force a compaction → journal
+    return data, n
+
+class LinkMemo:
+    """The memo only decides how often a page is *fetched* (once per run, or
+    never again once persisted).  How often it is *counted* is decided by
+    COUNT_SHARED through the seen-sets handed to handle_card()."""
+    def __init__(self, path:Path|None=MEMO_FILE, ttl:float=TTL):
+        self.path, self.ttl, self.lock = path, ttl, threading.Lock()
+        self.data:dict[str,dict] = {}
+        self.fh = None
+        if path:
+            self.data, n = read(path)
+            if n < 0 or n > 2 * len(self.data) + 100: self._compact()
+
+    def get(self, key:str) -> tuple[list,int]|None:
+        hit = self.data.get(key)
+        if not hit or time.time() - hit.get("ts", 0) > self.ttl: return None
+        return [tuple(l) for l in hit["lines"]], hit["words"]
+
+    def put(self, key:str, lines:list, wc:int) -> tuple[list,int]:
+        rec = {"lines": lines, "words": wc, "ts": time.time()}
+        with self.lock:
+            self.data[key] = rec; self._append({"key": key, **rec})
+        return lines, wc
+
+    def drop(self, key:str):
+        with self.lock:
+            if self.data.pop(key, None) is not None: self._append({"key": key, "drop": True})
+
+    def save(self):
+        with self.lock:
+            if self.fh: self.fh.flush()
+
+    def _append(self, rec:dict):             # caller holds the lock
+        if self.path is None: return
+        if self.fh is None: self.fh = self.path.open("a", encoding="utf-8")
+        self.fh.write(json.dumps(rec) + "\n")
+
+    def _compact(self):
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for k, v in self.data.items(): fh.write(json.dumps({"key": k, **v}) + "\n")
+        os.replace(tmp, self.path)
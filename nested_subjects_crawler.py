@@ -9,21 +9,34 @@
 #
 # One HTML per (Subject Variant , Year)  ➜  html/
 # Appends to data.csv  (Subject label, Year, URL, Status, UTC)
+#
+# Only the first year of a subject goes through the widget; its URL
+# gives the learning-area slug and the other years are opened straight
+# from the pattern (FAST_URLS), falling back to the widget if needed.
+#
+# INCREMENTAL=1 re-renders pairs that already have an HTML file and only
+# rewrites them (and logs a CSV row) when the visible content changed.
 # -------------------------------------------------------------
-import csv, pathlib, re, time, unicodedata, contextlib, itertools
+import csv, pathlib, re, unicodedata, contextlib, itertools
 from datetime import datetime, UTC
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
 
+from page_cache import CACHE
+from curriculum_urls import area_of, pair_url, url_live
+from fingerprints import FP, INCREMENTAL
+from waits import settle
+import api_capture, spans, browser
+
 # ─── CONSTANTS ────────────────────────────────────────────────
 HOME_URL  = "https://v9.australiancurriculum.edu.au/"
 HTML_DIR  = pathlib.Path("html"); HTML_DIR.mkdir(exist_ok=True)
 CSV_PATH  = pathlib.Path("FinalData.csv")
+FAST_URLS = True          # build later years from the learned URL pattern
+HEADLESS  = True
 
 YEARS = {
     "foundationYear": "Foundation Year", "year1": "Year 1", "year2": "Year 2",
@@ -124,6 +137,7 @@ POPUP_X   = "//div[contains(@class,'F10CurriculumWidget')]"
 BTN_SUBJ  = "(//button[contains(@class,'InputSelector-button')])[1]"
 BTN_YEAR  = "(//button[contains(@class,'InputSelector-button')])[2]"
 SUBMIT_CS = "button.LearningAreaSelector-submitButton.LearningAreaSelector-button"
+HEADER_CS = "main div.CurriculumView-sectionHeader"
 SLIDE_X   = ("//section[contains(@class,'SlideOut') and contains(@class,'is-open')]/div/button")
 CHEVRON_JS = "arguments[0].click()"
 
@@ -139,7 +153,7 @@ def js_click(d, el):
 def open_widget(drv):
     drv.execute_script("document.querySelector(arguments[0]).click()", NAV_F10_JS)
     WebDriverWait(drv,10).until(EC.visibility_of_element_located((By.XPATH,POPUP_X)))
-    time.sleep(0.4)
+    settle(drv,"open_widget",0.4)
 
 def close_slideout(drv):
     with contextlib.suppress(TimeoutException):
@@ -164,7 +178,7 @@ def expand_to_label(drv, label_el):
                 "./ancestor::div[contains(@class,'InputSelector-checkboxListItem')][1]"
                 "/div/button[contains(@class,'icon-prefix-button')]")
             drv.execute_script(CHEVRON_JS, chevron)
-            time.sleep(0.3)
+            settle(drv,"chevron",0.3)
 
 def iterate_years(code):
     """Return iterable of year codes allowed by sequence suffix."""
@@ -201,14 +215,33 @@ def crawl_pair(drv, subj_code, subj_label, year_code, year_label):
     js_click(drv, submit)
 
     WebDriverWait(drv,12).until(EC.invisibility_of_element_located((By.XPATH,POPUP_X)))
-    wait_dom(drv); close_slideout(drv); time.sleep(0.6)
+    wait_dom(drv); close_slideout(drv); settle(drv,"pair_loaded",0.6)
+    return "saved", drv.page_source, drv.current_url
+
+def load_home(drv):
+    drv.get(HOME_URL); wait_dom(drv); settle(drv,"home",1.5)
+    with contextlib.suppress(TimeoutException):
+        WebDriverWait(drv,4).until(
+            EC.element_to_be_clickable((By.XPATH,COOKIE_X))).click()
+
+def direct_pair(drv, area, year_code):
+    """Open a pair from the URL pattern; None → caller uses the widget."""
+    link = pair_url(area, year_code)
+    if not url_live(link):
+        return None
+    drv.get(link); wait_dom(drv)
+    try:
+        WebDriverWait(drv,8).until(EC.presence_of_element_located((By.CSS_SELECTOR,HEADER_CS)))
+    except TimeoutException:
+        return None
+    if area_of(drv.current_url) != area or link.split("?")[0] not in drv.current_url:
+        return None                              # redirected elsewhere
+    close_slideout(drv); settle(drv,"pair_loaded",0.6)
     return "saved", drv.page_source, drv.current_url
 
 # ─── main loop ---------------------------------------------------------------
 def main():
-    opts=Options(); opts.add_argument("--window-size=1400,900")
-    # opts.add_argument("--headless=new")
-    drv=webdriver.Chrome(options=opts)
+    drv=browser.start(HEADLESS, (1400, 900))
 
     try:
         with CSV_PATH.open("a", newline="", encoding="utf-8") as fcsv:
@@ -224,19 +257,32 @@ def main():
             )
 
             for code,label in subject_iter:
+                area = None                             # learned per subject
                 for y_code in iterate_years(code):
                     y_label = YEARS[y_code]
                     out_html = HTML_DIR/f"{safe(label)}__{safe(y_label)}.html"
-                    if out_html.exists():               # skip done
+                    if out_html.exists() and not INCREMENTAL:   # skip done
                         continue
 
-                    # load fresh home page each loop
-                    drv.get(HOME_URL); wait_dom(drv); time.sleep(1.5)
-                    with contextlib.suppress(TimeoutException):
-                        WebDriverWait(drv,4).until(
-                            EC.element_to_be_clickable((By.XPATH,COOKIE_X))).click()
-
-                    stat,html,link = crawl_pair(drv,code,label,y_code,y_label)
+                    pair = f"pair:{code}/{y_code}"
+                    hit  = None if INCREMENTAL else CACHE.get(HOME_URL, pair)
+                    if hit:
+                        stat,html,link = (hit["meta"]["status"], hit["html"],
+                                          hit["meta"]["url"])
+                    else:
+                        with spans.row("nested", label, y_label, pair=pair):
+                            with spans.span("nav:direct"):
+                                res = direct_pair(drv,area,y_code) if FAST_URLS and area else None
+                            if res is None:
+                                with spans.span("nav:widget"):
+                                    load_home(drv)      # widget needs a fresh home page
+                                    res = crawl_pair(drv,code,label,y_code,y_label)
+                        stat,html,link = res
+                        CACHE.put(HOME_URL, html or "", pair, status=stat, url=link)
+                        api_capture.drain(drv, link or HOME_URL, pair)
+                    area = area or area_of(link)
+                    if stat=="saved" and not FP.observe(link,"page",html) and out_html.exists():
+                        print(f"= {out_html.name} unchanged"); continue
                     utc=datetime.now(UTC).isoformat(timespec="seconds")
                     wr.writerow([label,y_label,link or "",stat,utc])
 
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+offline_extract.py
+──────────────────
+Replay the three extractors over archived HTML – no browser at all
+
+Sources (all written as a side effect of the normal crawls):
+• page cache "understanding" entry per row URL       → Understanding of the learning area
+• page cache "desc-ach" entry per row URL,
+  else html/<Subject>__<Year>.html                    → Description/Achievement
+• archive/<Subject>__<Year>.json (cards + drawers)
+  + cached snapshot/resource HTML, else the lines
+    kept in the link memo                             → Content description
+• api_fixtures/ (API_CAPTURE=1 runs, api_capture.py) → Content description (API)
+
+A content row whose linked page is in neither the cache nor the memo is
+reported as incomplete and left out rather than counted short.
+
+Rows run in a process pool, so a change to a counting rule or the PDF
+layout is replayed over the whole corpus in seconds.
+
+    python offline_extract.py                   # → offline_results.csv
+    python offline_extract.py --workers 8 --pdf # also re-render the PDFs
+    python offline_extract.py --write           # update FinalData.csv in place
+"""
+
+from __future__ import annotations
+import re, sys, json, argparse, traceback, unicodedata
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from page_cache import PageCache
+import link_memo
+from extractors import INDENT, html_to_lines, extract_lines, lines_from
+from pdf_out import line_words, render
+from api_capture import api_lines
+from resume import PDF_NAMES
+
+CSV_FILE    = Path("FinalData.csv")
+OUT_FILE    = Path("offline_results.csv")
+HTML_DIR    = Path("html")
+ARCHIVE_DIR = Path("archive")
+DATA_DIR    = Path("data")
+
+STAGES = {
+    "understanding": "Understanding of the learning area",
+    "desc-ach":      "Description/Achievement",
+    "content":       "Content description",
+    "content-api":   "Content description (API)",
+}
+
+CACHE = PageCache(ttl=float("inf"))         # archived pages never go stale here
+slug  = lambda s: re.sub(r"[\\/:'\"*?<>|]+", "_", str(s).strip())
+say   = lambda m: print(m, flush=True)
+
+_memo:dict|None = None
+
+def memo_lines(kind:str, href:str) -> list|None:
+    """Lines the live crawl counted for a linked page (read-only, no TTL)."""
+    global _memo
+    if _memo is None: _memo = link_memo.read(link_memo.MEMO_FILE)[0]
+    hit = _memo.get(f"{kind}:{href}")
+    return [tuple(l) for l in hit["lines"]] if hit else None
+
+def safe(name:str) -> str:      # same as the subject crawlers' html/ names
+    txt = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^\w\-]+", "_", txt).strip("_")[:120]
+
+# ─── per-stage replay ────────────────────────────────────────────────
+def understanding(subj, yr, url):
+    hit = CACHE.get(url, "understanding")
+    return extract_lines(hit["html"]) if hit else None
+
+def desc_ach(subj, yr, url):
+    hit = CACHE.get(url, "desc-ach")
+    if hit:
+        return lines_from(hit["html"], yr) or None
+    p = HTML_DIR/f"{safe(subj)}__{safe(yr)}.html"
+    return (lines_from(p.read_text("utf-8"), yr) or None) if p.exists() else None
+
+def card_lines(c:dict) -> list:
+    """An archived card's own lines: code heading, card, drawer."""
+    return [(c["code"], "Helvetica-Bold", 14, 0), *html_to_lines(c["card"]), *html_to_lines(c["drawer"])]
+
+def content(subj, yr, url):
+    p = ARCHIVE_DIR/f"{slug(subj)}__{slug(yr)}.json"
+    if not p.exists(): return None
+    lines = []
+    for c in json.loads(p.read_text("utf-8"))["cards"]:
+        lines += card_lines(c)
+        for kind, title, links in (("snapshot", "Snapshot", c["snapshots"]),
+                                   ("resource", "Resource", c["resources"])):
+            for href, lbl in links:
+                hit = CACHE.get(href, kind)
+                lines.append((f"{title} – {lbl}", "Helvetica-Bold", 12, 0))
+                if hit:
+                    lines += html_to_lines(hit["html"], indent=INDENT)
+                elif (got := memo_lines(kind, href)) is not None:
+                    lines += got
+                else:
+                    say(f"   incomplete {subj} / {yr}: {kind} {href} not cached or memoised")
+                    return None
+    return lines
+
+def content_api(subj, yr, url):
+    """Cards from the captured JSON (api_capture.py) – no linked pages."""
+    return api_lines(url) or None
+
+REPLAY = {"understanding": understanding, "desc-ach": desc_ach, "content": content,
+          "content-api": content_api}
+
+# ─── optional PDF re-render (same layout as the live scripts) ────────
+PDF_NAME = {**PDF_NAMES, "content-api": "Content description (API)-{s}-{y}.pdf"}
+LAYOUT = {"understanding": dict(margin=40, line_sp=1.4, wrap=90),
+          "desc-ach":      dict(margin=40, line_sp=1.4),
+          "content":       dict(margin=40, line_sp=1.35),
+          "content-api":   dict(margin=40, line_sp=1.35)}
+
+# ─── worker ──────────────────────────────────────────────────────────
+def replay(task) -> dict:
+    i, subj, yr, url, stages, pdf = task
+    out = {"row": i}
+    for st in stages:
+        try:
+            lines = REPLAY[st](subj, yr, url)
+        except Exception:
+            traceback.print_exc(limit=1); lines = None
+        if lines is None: continue
+        out[STAGES[st]] = line_words(lines, LAYOUT[st].get("wrap"))
+        if pdf:
+            render(lines, DATA_DIR/slug(subj)/slug(yr)/PDF_NAME[st].format(s=subj, y=yr),
+                   **LAYOUT[st])
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay extractors over archived HTML")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--stages", nargs="+", choices=list(STAGES),
+                    default=[st for st in STAGES if st != "content-api"])
+    ap.add_argument("--pdf", action="store_true", help="re-render PDFs under data/")
+    ap.add_argument("--write", action="store_true", help="update FinalData.csv in place")
+    a = ap.parse_args(argv)
+
+    df = pd.read_csv(CSV_FILE, dtype=str)
+    tasks = [(i, r["Subject"], r["Year"], r["URL"], a.stages, a.pdf)
+             for i, r in df.iterrows()]
+    with ProcessPoolExecutor(a.workers) as ex:
+        results = list(ex.map(replay, tasks, chunksize=8))
+
+    for st in a.stages:
+        if STAGES[st] not in df.columns: df[STAGES[st]] = ""
+    hits = 0
+    for r in results:
+        for col, wc in r.items():
+            if col == "row": continue
+            df.at[r["row"], col] = wc; hits += 1
+    dst = CSV_FILE if a.write else OUT_FILE
+    df.to_csv(dst, index=False)
+    say(f"{hits} cells replayed from archive → {dst}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+page_cache.py
+─────────────
+Persistent on-disk page cache shared by every crawler / extractor
+
+• key   = sha256(canonical URL + rendered-state tag), so the same URL
+          can be stored once per state ("expanded", "desc-ach", …)
+• entry = gzip'd JSON {url, state, saved, html, meta}
+• TTL checked on read, size-based eviction (oldest first) on write
+• writes go through tmp file + os.replace → safe for parallel workers
+
+    from page_cache import CACHE
+    hit = CACHE.get(url, "expanded")          # → dict | None
+    CACHE.put(url, html, "expanded", title=…)  # extra kwargs land in meta
+
+Set PAGE_CACHE=0 in the environment to bypass it for a run.
+"""
+
+from __future__ import annotations
+import os, gzip, json, time, hashlib, threading
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# ─── tunables ────────────────────────────────────────────────────────
+CACHE_DIR = Path(os.environ.get("PAGE_CACHE_DIR", ".page_cache"))
+TTL       = 7 * 24 * 3600          # seconds an entry stays fresh
+MAX_BYTES = 512 * 1024 * 1024      # on-disk budget before eviction
+ENABLED   = os.environ.get("PAGE_CACHE", "1") != "0"
+
+# ─── keys ────────────────────────────────────────────────────────────
+def canonical(url:str) -> str:
+    """Lower-case scheme/host, drop fragment + trailing '/', sort query."""
+    p = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(p.query, keep_blank_values=True)))
+    path = p.path.rstrip("/") or "/"
+    return urlunsplit((p.scheme.lower(), p.netloc.lower(), path, query, ""))
+
+def cache_key(url:str, state:str="") -> str:
+    return hashlib.sha256(f"{canonical(url)}\n{state}".encode()).hexdigest()
+
+# ─── cache ───────────────────────────────────────────────────────────
+class PageCache:
+    def __init__(self, root:Path=CACHE_DIR, ttl:float=TTL,
+                 max_bytes:int=MAX_BYTES, enabled:bool=ENABLED):
+        self.root, self.ttl, self.max_bytes = Path(root), ttl, max_bytes
+        self.enabled = enabled
+        self._lock  = threading.Lock()
+        self._bytes:int|None = None       # lazily summed on first put
+
+    def _path(self, key:str) -> Path:
+        return self.root/key[:2]/f"{key}.json.gz"
+
+    def get(self, url:str, state:str="") -> dict|None:
+        if not self.enabled:
+            return None
+        p = self._path(cache_key(url, state))
+        try:
+            if time.time() - p.stat().st_mtime > self.ttl:
+                return None
+            with gzip.open(p, "rt", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url:str, html:str, state:str="", **meta) -> None:
+        if not self.enabled:
+            return
+        p = self._path(cache_key(url, state))
+        p.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"url": canonical(url), "state": state,
+                 "saved": time.time(), "html": html, "meta": meta}
+        tmp = p.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            json.dump(entry, fh)
+        size = tmp.stat().st_size
+        os.replace(tmp, p)
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._du()
+            else:
+                self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def drop(self, url:str, state:str="") -> None:
+        self._path(cache_key(url, state)).unlink(missing_ok=True)
+
+    def fetch(self, url:str, state:str, load) -> dict:
+        """Read-through: return the cached entry or call load() → html."""
+        hit = self.get(url, state)
+        if hit is None:
+            self.put(url, load(), state)
+            hit = self.get(url, state) or {"html": "", "meta": {}}
+        return hit
+
+    # ── eviction ────────────────────────────────────────────────────
+    def _entries(self):
+        return [(p.stat().st_mtime, p.stat().st_size, p)
+                for p in self.root.glob("*/*.json.gz")]
+
+    def _du(self) -> int:
+        return sum(sz for _, sz, _ in self._entries())
+
+    def _evict(self):
+        """Drop expired entries, then oldest first until under 90 % budget."""
+        now, total = time.time(), 0
+        keep = []
+        for mt, sz, p in sorted(self._entries()):
+            if now - mt > self.ttl:
+                p.unlink(missing_ok=True)
+            else:
+                keep.append((sz, p)); total += sz
+        for sz, p in keep:
+            if total <= self.max_bytes * .9:
+                break
+            p.unlink(missing_ok=True); total -= sz
+        self._bytes = total
+
+    def clear(self):
+        for p in self.root.glob("*/*.json.gz"):
+            p.unlink(missing_ok=True)
+        self._bytes = 0
+
+CACHE = PageCache()
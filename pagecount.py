@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+pagecount.py
+────────────
+Regenerate CombinedResults_with_pagecounts.csv from FinalData.csv + data/
+
+• "Page count WRT PDF's" – pages of every PDF in data/<subject>/<year>/,
+  read from the trailer's /Root → /Pages → /Count only (no page or text
+  parsing), one process-pool pass over the whole corpus
+• "Count of pages(330 words per page)" – (understanding + description/
+  achievement + content words) // 330, one vectorised pandas expression
+• the combined CSV is refreshed in place (FinalData.csv seeds it the
+  first time); word cells the extractors filled in FinalData.csv are
+  carried over by URL first. A row with a missing count or PDF folder
+  gets an empty cell
+
+    python pagecount.py                # → CombinedResults_with_pagecounts.csv
+    python pagecount.py --workers 8 --out other.csv
+"""
+
+from __future__ import annotations
+import os, re, sys, time, argparse, collections
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+SRC_CSV        = Path("FinalData.csv")
+OUT_CSV        = Path("CombinedResults_with_pagecounts.csv")
+DATA_DIR       = Path("data")
+WORDS_PER_PAGE = 330
+WORD_COLS      = ("Understanding of the learning area", "Description/Achievement",
+                  "Content description")
+PAGES_COL      = "Page count WRT PDF's"
+EST_COL        = f"Count of pages({WORDS_PER_PAGE} words per page)"
+
+slug = lambda s: re.sub(r"[\\/:'\"*?<>|]+", "_", str(s).strip())
+say  = lambda m: print(m, flush=True)
+
+# ─── page tree ───────────────────────────────────────────────────────
+def pages(path:Path) -> int|None:
+    """Page count from the document catalogue; full page walk only if that fails."""
+    from PyPDF2 import PdfReader
+    try:
+        r = PdfReader(str(path))
+        try:
+            return int(r.trailer["/Root"]["/Pages"]["/Count"])
+        except (KeyError, TypeError, ValueError):
+            return len(r.pages)
+    except Exception:
+        return None
+
+def page_counts(paths:list[Path], workers:int|None=None) -> dict[Path,int|None]:
+    with ProcessPoolExecutor(workers) as ex:
+        return dict(zip(paths, ex.map(pages, paths, chunksize=64)))
+
+# ─── combined CSV ────────────────────────────────────────────────────
+def overlay(df:pd.DataFrame, src:pd.DataFrame) -> pd.DataFrame:
+    """Take every non-empty word cell of src, matched on URL."""
+    src = src.set_index("URL")
+    for c in WORD_COLS:
+        if c not in df.columns: df[c] = ""
+        if c not in src.columns: continue
+        new = df["URL"].map(src[c])
+        df[c] = new.where(new.notna() & (new.str.strip() != ""), df[c])
+    return df
+
+def combine(df:pd.DataFrame, counts:dict[Path,int|None]) -> pd.DataFrame:
+    per_dir = collections.defaultdict(int)
+    for p, n in counts.items():
+        if n is not None: per_dir[p.parent] += n
+    dirs = [DATA_DIR/slug(s)/slug(y) for s, y in zip(df["Subject"], df["Year"])]
+    df[PAGES_COL] = pd.array([per_dir.get(d) for d in dirs], dtype="Int64")
+
+    words = df[list(WORD_COLS)].apply(pd.to_numeric, errors="coerce")
+    df[EST_COL] = (words.sum(axis=1, min_count=len(WORD_COLS)) // WORDS_PER_PAGE).astype("Int64")
+    return df
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Recompute PDF page counts and the combined CSV")
+    ap.add_argument("--src", type=Path, default=SRC_CSV)
+    ap.add_argument("--out", type=Path, default=OUT_CSV)
+    ap.add_argument("--workers", type=int, default=None)
+    a = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    src = pd.read_csv(a.src, dtype=str)
+    df = overlay(pd.read_csv(a.out, dtype=str) if a.out.exists() else src.copy(), src)
+    counts = page_counts(sorted(DATA_DIR.rglob("*.pdf")), a.workers)
+    bad = [p for p, n in counts.items() if n is None]
+    for p in bad: say(f"!! unreadable: {p}")
+
+    df = combine(df, counts)
+    tmp = a.out.with_suffix(f".{os.getpid()}.tmp")
+    df.to_csv(tmp, index=False); os.replace(tmp, a.out)
+    say(f"{len(counts)} PDFs ({len(bad)} unreadable), {df[PAGES_COL].notna().sum()} rows "
+        f"with pages, {df[EST_COL].notna().sum()} with estimates → {a.out} "
+        f"in {time.perf_counter()-t0:.1f}s")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+pdf_out.py
+──────────
+One PDF writer for every extractor – counts come from the lines, not the PDF
+
+• line_words(lines, wrap) counts exactly the text drawn on the page
+  (after the same textwrap the renderer applies), so no PyPDF2 reparse –
+  the same rule as the old re-parse, stored counts stay comparable
+• Stream: lines are drawn chunk by chunk as cards are produced, so a
+  big page's text never sits in memory as one line list; the Canvas is
+  saved every SEGMENT_PAGES pages (it keeps its pages until save()) and
+  the parts are joined when the PDF is finished
+• PDF_MODE  = "background" (default) renders on a writer thread while the
+              browser keeps crawling, "sync" renders inline, "off" skips PDFs
+• the fonts are reportlab's built-in Helvetica (WinAnsi, plus the Symbol
+  / ZapfDingbats fallback): CJK, Arabic, Devanagari, … are drawn as
+  blank boxes, so line_words() counts them the way the PDF shows them –
+  each such character splits a word instead of being part of one
+• PDF_VERIFY=1 re-extracts every rendered PDF with PyPDF2 and reports any
+  difference from the line-based count
+
+    wc = emit(lines, path, margin=40, line_sp=1.4, wrap=90)
+    with Stream(path, margin=40) as out:   # or chunk by chunk (big pages)
+        out.add(lines)
+    …
+    flush()          # before exit – waits for queued PDFs
+"""
+
+from __future__ import annotations
+import os, queue, shutil, textwrap, threading, functools
+from pathlib import Path
+from extractors import words
+import spans
+
+PDF_MODE   = os.environ.get("PDF_MODE", "background")   # background | sync | off
+PDF_VERIFY = os.environ.get("PDF_VERIFY", "0") == "1"
+SEGMENT_PAGES = int(os.environ.get("PDF_SEGMENT_PAGES", "50"))   # pages per in-memory Canvas
+say = lambda m: print(m, flush=True)
+
+def segments(txt:str, wrap:int|None):
+    return (textwrap.wrap(txt, wrap) or [""]) if wrap else [txt]
+
+@functools.lru_cache(maxsize=None)
+def drawable(ch:str) -> bool:
+    """Helvetica or one of reportlab's substitution fonts has a glyph for ch."""
+    from reportlab.pdfbase.pdfmetrics import getFont
+    f = getFont("Helvetica")
+    for font in (f, *f.substitutionFonts):
+        try:
+            ch.encode(font.encName); return True
+        except UnicodeEncodeError:
+            continue
+    return False
+
+def drawn(txt:str) -> str:
+    """txt as it reads back from the PDF – undrawable characters become ■."""
+    if txt.isascii(): return txt
+    return "".join(ch if ch.isspace() or drawable(ch) else "■" for ch in txt)
+
+def line_words(lines, wrap:int|None=None) -> int:
+    """Words on the rendered page; lines are (text, font, size[, indent])."""
+    return words(drawn("\n".join(seg for ln in lines for seg in segments(ln[0], wrap))))
+
+# ─── rendering ───────────────────────────────────────────────────────
+class Pen:
+    """Canvas plus cursor – lines can be drawn in as many chunks as needed.
+
+    Every SEGMENT_PAGES pages the Canvas is saved as a part file and a
+    fresh one continues on the next page; save() joins the parts.
+    """
+    def __init__(self, path:Path, margin:float=40, line_sp:float=1.4, wrap:int|None=None,
+                 segment:int=SEGMENT_PAGES):
+        from reportlab.lib.pagesizes import A4
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path, self.parts, self.segment = path, [], segment
+        self.margin, self.line_sp, self.wrap = margin, line_sp, wrap
+        self.size = A4; self.top = A4[1] - margin; self.y = self.top
+        self.c = self._canvas()
+
+    def _canvas(self):
+        from reportlab.pdfgen.canvas import Canvas
+        self.parts.append(self.path.with_suffix(f".part{len(self.parts)}.pdf"))
+        self.pages = 1
+        return Canvas(str(self.parts[-1]), pagesize=self.size)
+
+    def _page(self):
+        if self.segment and self.pages >= self.segment:
+            self.c.save(); self.c = self._canvas()
+        else:
+            self.c.showPage(); self.pages += 1
+        self.y = self.top
+
+    def draw(self, lines):
+        m = self.margin
+        for txt, fnt, sz, *ind in lines:
+            self.c.setFont(fnt, sz)
+            for seg in segments(txt, self.wrap):
+                if self.y < m: self._page(); self.c.setFont(fnt, sz)
+                self.c.drawString(m + (ind[0] if ind else 0), self.y, seg); self.y -= sz * self.line_sp
+
+    def save(self):
+        self.c.save()
+        if len(self.parts) == 1:
+            os.replace(self.parts[0], self.path); return
+        from PyPDF2 import PdfWriter
+        w, tmp = PdfWriter(), self.path.with_suffix(".join.pdf")
+        for p in self.parts: w.append(str(p))
+        with tmp.open("wb") as fh: w.write(fh)
+        os.replace(tmp, self.path); self.discard()
+
+    def discard(self):
+        for p in self.parts: p.unlink(missing_ok=True)
+
+def render(lines, path:Path, margin:float=40, line_sp:float=1.4, wrap:int|None=None):
+    pen = Pen(path, margin, line_sp, wrap); pen.draw(lines); pen.save()
+
+def pdf_words(path:Path) -> int:
+    from PyPDF2 import PdfReader
+    return words("\n".join(pg.extract_text() or "" for pg in PdfReader(str(path)).pages))
+
+def link_copy(src:Path, dst:Path):
+    """Hard-link src to dst (copy if links unsupported)."""
+    if src == dst: return
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+    try: os.link(src, dst)
+    except OSError: shutil.copyfile(src, dst)
+
+# ─── background writer ───────────────────────────────────────────────
+_q:queue.Queue = queue.Queue(maxsize=64)
+_thread:threading.Thread|None = None
+_lock = threading.Lock()
+
+def _drain():
+    while True:
+        fn, args = _q.get()
+        try:
+            fn(*args)
+        except Exception as e:
+            say(f"   !! PDF {args[0].path}: {e.__class__.__name__}: {e}")
+        finally:
+            _q.task_done()
+
+def _send(fn, *args):
+    global _thread
+    if PDF_MODE == "off":
+        return
+    if PDF_MODE == "sync":
+        fn(*args); return
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_drain, name="pdf-writer", daemon=True)
+            _thread.start()
+    _q.put((fn, args))              # bounded → a fast crawler waits for the writer
+
+# ─── streaming writer ────────────────────────────────────────────────
+class Stream:
+    """Push lines as they are produced; only the current chunk's line list
+    is held – the Canvas still accumulates its pages until save().
+
+        with pdf_out.Stream(path, margin=40, line_sp=1.35) as out:
+            for card in …: out.add(card_lines)
+        wc = out.wc
+
+    Chunks are drawn straight onto the canvas (on the writer thread in
+    background mode). An exception inside the block discards the PDF.
+    """
+    def __init__(self, path:Path, links=(), **layout):
+        self.path, self.links, self.layout = Path(path), [Path(p) for p in links], layout
+        self.wc, self.pen = 0, None
+        self.tags = spans.ctx()            # the writer thread has no row of its own
+
+    def add(self, lines):
+        lines = list(lines)
+        self.wc += line_words(lines, self.layout.get("wrap"))
+        _send(Stream._draw, self, lines)
+
+    def _draw(self, lines):
+        with spans.span("pdf-write", **self.tags):
+            if self.pen is None: self.pen = Pen(self.path, **self.layout)
+            self.pen.draw(lines)
+
+    def _finish(self, wc):
+        with spans.span("pdf-write", **self.tags):
+            if self.pen is None: self.pen = Pen(self.path, **self.layout)
+            self.pen.save(); self.pen = None
+        if PDF_VERIFY:
+            with spans.span("pdf-reparse", **self.tags):
+                got = pdf_words(self.path)
+            if got != wc:
+                say(f"   ⚠ {self.path.name}: PDF re-extract {got} ≠ line count {wc}")
+        for dst in self.links:
+            link_copy(self.path, dst)
+
+    def _abort(self):
+        if self.pen is not None: self.pen.discard()
+        self.pen = None
+
+    def __enter__(self): return self
+
+    def __exit__(self, exc, *_):
+        if exc: _send(Stream._abort, self)
+        else:   _send(Stream._finish, self, self.wc)
+
+def emit(lines, path:Path, *, links=(), **layout) -> int:
+    """Queue/render the PDF for lines and return its word count now."""
+    with Stream(path, links, **layout) as out:
+        out.add(lines)
+    return out.wc
+
+def flush():
+    """Block until every queued PDF has been written."""
+    if _thread is not None:
+        _q.join()
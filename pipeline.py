@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+pipeline.py
+───────────
+One page visit per FinalData.csv row, every metric from that visit
+
+• each row URL is loaded once; the registered stages then run in order
+  on the open page instead of three scripts loading it three times
+• a stage is (column, fn(driver, subject, year, url) → word count);
+  the stock ones wrap the three extractor scripts (loaded=True):
+    understanding – reads the slide-out CTA before it is closed
+    desc-ach      – expands the level-description / achievement accordions
+    content       – walks the content-description cards (last: it navigates)
+• every stage keeps its own page cache, PDF and results.sqlite column,
+  so the single-metric scripts and offline_extract.py still replay it
+• a failing stage is logged and skipped – the others still count; a
+  hung or dead Chrome restarts the whole visit (supervisor.py)
+• resume: per stage, rows with a value and a PDF are planned out before
+  any browser starts; a row is visited only for its pending stages
+  (RESUME=0 → everything, see resume.py)
+
+    python pipeline.py                          # all rows, all stages
+    python pipeline.py 10 100 --workers 3
+    python pipeline.py --stages desc-ach content
+"""
+
+from __future__ import annotations
+import sys, queue, argparse, threading, traceback, functools, importlib.util
+from pathlib import Path
+import pandas as pd
+from selenium.webdriver.support.ui import WebDriverWait
+from results_store import STORE
+from resume import plan, pdf_path
+import pdf_out, spans
+from supervisor import Supervised, fatal
+
+CSV_FILE     = Path("FinalData.csv")
+PAGE_TIMEOUT = 35
+say = lambda m: print(m, flush=True)
+
+# ─── the extractor scripts (hyphenated → loaded by path) ─────────────
+_loading = threading.RLock()     # workers may ask for the same script at once
+
+def script(name:str):
+    """Load a hyphenated script once per process.  Registered before it runs
+    (as import does), so a concurrent caller waits instead of executing it
+    a second time with its own driver pools, memo and caches."""
+    with _loading:
+        mod = sys.modules.get(name)
+        if mod is None:
+            spec = importlib.util.spec_from_file_location(
+                name.replace("-", "_"), Path(__file__).with_name(f"{name}.py"))
+            mod = sys.modules[name] = importlib.util.module_from_spec(spec)
+            try:
+                spec.loader.exec_module(mod)
+            except BaseException:
+                del sys.modules[name]; raise
+        return mod
+
+U = lambda: script("understanding-subject")
+D = lambda: script("description-achievement-crawler")
+C = lambda: script("content-description-extractor")
+
+# ─── stages ──────────────────────────────────────────────────────────
+def understanding(d, subj, yr, url):
+    return U().process(d, subj, yr, url, loaded=True)
+
+def desc_ach(d, subj, yr, url):
+    return D().process_row(d, subj, yr, url, loaded=True)
+
+def content(d, subj, yr, url):
+    return C().crawl(d, url, subj, yr, loaded=True)
+
+STAGES = {        # run order; anything before "desc-ach" sees the slide-out open
+    "understanding": ("Understanding of the learning area", understanding),
+    "desc-ach":      ("Description/Achievement",            desc_ach),
+    "content":       ("Content description",                content),
+}
+SLIDEOUT_OPEN = {"understanding"}
+
+# ─── one visit ───────────────────────────────────────────────────────
+def visit(d, subj, yr, url, stages) -> dict[str,int]:
+    with spans.span("nav"):
+        d.get("about:blank"); d.get(url)
+        WebDriverWait(d, PAGE_TIMEOUT).until(C().READY)
+    out, closed = {}, False
+    for name in stages:
+        col, fn = STAGES[name]
+        if name not in SLIDEOUT_OPEN and not closed:
+            D().close_slideout(d); closed = True
+        try:
+            with spans.span(f"stage:{name}"):
+                out[col] = fn(d, subj, yr, url)
+            STORE.record_attempt(subj, yr, col)
+        except Exception as e:
+            if fatal(e): raise                    # driver gone – Supervised re-runs the visit
+            STORE.record_attempt(subj, yr, col, e.__class__.__name__)
+            say(f"!! {name} {subj} / {yr}: {e.__class__.__name__}")
+            traceback.print_exc(limit=1)
+    return out
+
+def worker(df, todo:queue.Queue):
+    sup = Supervised(C().start_driver)
+    try:
+        while True:
+            try:
+                i, stages = todo.get_nowait()
+            except queue.Empty:
+                return
+            subj, yr, url = df.at[i,"Subject"], df.at[i,"Year"], df.at[i,"URL"]
+            if not isinstance(url, str) or not url.startswith("http"):
+                say(f"[skip] row {i}: bad URL"); continue
+            try:
+                with spans.row("pipeline", subj, yr, url=url):
+                    res = sup.run(visit, subj, yr, url, stages)
+                for col, wc in res.items():
+                    STORE.upsert(subj, yr, col, wc)
+                if "content" in stages: C().MEMO.save()
+                say(f"[ok] row {i}: {subj} {yr}")
+            except Exception as e:
+                say(f"[ERR] row {i}: {e.__class__.__name__}")
+                traceback.print_exc(limit=1)
+    finally:
+        sup.quit()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Crawl every metric in one page visit per row")
+    ap.add_argument("range", nargs="*", type=int, help="FROM TO (inclusive, 0-based)")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    a = ap.parse_args(argv)
+    stages = [s for s in STAGES if s in a.stages]
+
+    df = pd.read_csv(CSV_FILE, dtype=str)
+    lo, hi = (a.range + [0, len(df)-1][len(a.range):])[:2]
+    rows = range(max(0, lo), min(len(df)-1, hi)+1)
+    pending = {s: set(plan(df, rows, STAGES[s][0], functools.partial(pdf_path, s))) for s in stages}
+    todo:queue.Queue = queue.Queue()
+    for i in rows:
+        if due := [s for s in stages if i in pending[s]]: todo.put((i, due))
+    if todo.empty(): return
+
+    n = max(1, min(a.workers, todo.qsize()))
+    say(f"{todo.qsize()} of rows {rows.start}..{rows.stop-1} on {n} worker(s): {', '.join(stages)}")
+    pool = [threading.Thread(target=worker, args=(df, todo), name=f"w{i}")
+            for i in range(n)]
+    try:
+        for t in pool: t.start()
+        for t in pool: t.join()
+    finally:
+        pdf_out.flush()
+        cols = tuple(STAGES[s][0] for s in stages)
+        say(f"{STORE.export(CSV_FILE, cols)} cells exported → {CSV_FILE}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
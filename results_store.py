@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+results_store.py
+────────────────
+SQLite (WAL) results store shared by every extractor
+
+• one row per (Subject, Year, metric) – upserts are atomic and O(1), so
+  parallel workers and separate scripts can write at the same time
+• attempts: per-row crawl status next to the values (see resume.py) –
+  ok resets the counter, each failure adds one
+• the CSVs are exports: FinalData.csv / CombinedResults_with_pagecounts.csv
+  are regenerated on demand, every column whose header matches a stored
+  metric is filled, everything else is kept as-is
+
+    python results_store.py export [CSV …]   # default: FinalData.csv
+    python results_store.py import [CSV …]   # seed the store from CSVs
+    python results_store.py show             # metric counts
+"""
+
+from __future__ import annotations
+import os, sys, time, sqlite3, threading
+from pathlib import Path
+import spans
+
+DB_FILE   = Path(os.environ.get("RESULTS_DB", "results.sqlite"))
+CSV_FILES = [Path("FinalData.csv"), Path("CombinedResults_with_pagecounts.csv")]
+KEY_COLS  = ("Subject", "Year", "URL")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    subject TEXT NOT NULL,
+    year    TEXT NOT NULL,
+    metric  TEXT NOT NULL,
+    value   TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (subject, year, metric)
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    subject TEXT NOT NULL,
+    year    TEXT NOT NULL,
+    metric  TEXT NOT NULL,
+    status  TEXT NOT NULL,
+    n       INTEGER NOT NULL,
+    error   TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (subject, year, metric)
+);"""
+
+class ResultsStore:
+    def __init__(self, path:Path=DB_FILE):
+        self.path, self._local = Path(path), threading.local()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers and a writer overlap."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.executescript(SCHEMA)
+            self._local.con = con
+        return con
+
+    def upsert(self, subj:str, yr:str, metric:str, value) -> None:
+        self.db.execute(
+            "INSERT INTO results VALUES (?,?,?,?,?) "
+            "ON CONFLICT(subject,year,metric) DO UPDATE "
+            "SET value=excluded.value, updated=excluded.updated",
+            (subj, yr, metric, None if value is None else str(value), time.time()))
+
+    def get(self, subj:str, yr:str, metric:str) -> str|None:
+        row = self.db.execute("SELECT value FROM results WHERE subject=? AND year=? AND metric=?",
+                              (subj, yr, metric)).fetchone()
+        return row[0] if row else None
+
+    def updated(self, subj:str, yr:str, metric:str) -> float|None:
+        """When the value was last written (None = never / empty)."""
+        row = self.db.execute("SELECT updated FROM results WHERE subject=? AND year=? "
+                              "AND metric=? AND value IS NOT NULL AND value != ''",
+                              (subj, yr, metric)).fetchone()
+        return row[0] if row else None
+
+    def metric(self, metric:str) -> dict[tuple[str,str],str]:
+        return {(s, y): v for s, y, v in self.db.execute(
+            "SELECT subject, year, value FROM results WHERE metric=?", (metric,))}
+
+    def metrics(self) -> list[str]:
+        return [m for (m,) in self.db.execute("SELECT DISTINCT metric FROM results")]
+
+    # ── attempts ────────────────────────────────────────────────────
+    def record_attempt(self, subj:str, yr:str, metric:str, error:str|None=None) -> None:
+        """error=None → ok (counter reset), else one more consecutive failure."""
+        self.db.execute(
+            "INSERT INTO attempts VALUES (?,?,?,?,?,?,?) "
+            "ON CONFLICT(subject,year,metric) DO UPDATE SET status=excluded.status, "
+            "n=CASE WHEN excluded.status='ok' THEN 0 ELSE attempts.n+1 END, "
+            "error=excluded.error, updated=excluded.updated",
+            (subj, yr, metric, "ok" if error is None else "error", int(error is not None),
+             error, time.time()))
+
+    def attempts(self, metric:str) -> dict[tuple[str,str],tuple[str,int,str|None]]:
+        return {(s, y): (st, n, e) for s, y, st, n, e in self.db.execute(
+            "SELECT subject, year, status, n, error FROM attempts WHERE metric=?", (metric,))}
+
+    # ── CSV bridge ──────────────────────────────────────────────────
+    def export(self, csv_path:Path=CSV_FILES[0], add:tuple[str,...]=()) -> int:
+        """Fill csv_path's metric columns from the store (atomic replace).
+
+        Columns listed in add are created when the CSV doesn't have them yet.
+        """
+        with spans.span("csv-write", file=str(csv_path)):
+            return self._export(csv_path, add)
+
+    def _export(self, csv_path:Path, add:tuple[str,...]) -> int:
+        import pandas as pd
+        df = pd.read_csv(csv_path, dtype=str)
+        for m in add:
+            if m not in df.columns: df[m] = ""
+        n = 0
+        for m in self.metrics():
+            if m not in df.columns: continue
+            vals = self.metric(m)
+            col = [vals.get((s, y)) for s, y in zip(df["Subject"], df["Year"])]
+            hit = pd.Series([v is not None for v in col], index=df.index)
+            df.loc[hit, m] = [v for v in col if v is not None]; n += int(hit.sum())
+        tmp = csv_path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_csv(tmp, index=False); os.replace(tmp, csv_path)
+        return n
+
+    def import_csv(self, csv_path:Path) -> int:
+        import pandas as pd
+        df = pd.read_csv(csv_path, dtype=str)
+        rows = [(r["Subject"], r["Year"], m, r[m], time.time())
+                for _, r in df.iterrows() for m in df.columns
+                if m not in KEY_COLS and isinstance(r[m], str) and r[m] != ""]
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT OR IGNORE INTO results VALUES (?,?,?,?,?)", rows)
+        return len(rows)
+
+STORE = ResultsStore()
+
+def main(argv):
+    cmd, paths = (argv[0] if argv else "show"), [Path(p) for p in argv[1:]]
+    if cmd == "export":
+        for p in paths or CSV_FILES[:1]:
+            print(f"{p}: {STORE.export(p)} cells from {STORE.path}")
+    elif cmd == "import":
+        for p in paths or CSV_FILES[:1]:
+            print(f"{p}: {STORE.import_csv(p)} cells seeded")
+    else:
+        for (m, n) in STORE.db.execute(
+                "SELECT metric, COUNT(*) FROM results GROUP BY metric ORDER BY metric"):
+            print(f"{n:6}  {m}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+resume.py
+─────────
+Resume planner shared by the extractors and pipeline.py
+
+• before any browser starts, every row in range is classified from
+    – its value     (results.sqlite, else the CSV cell)
+    – its PDF       (under data/; not checked when PDF_MODE=off)
+    – its attempts  (per-row status record, "attempts" table)
+  into done / no value / no PDF / retry / gave up – the plan is printed
+  and only the pending rows are crawled
+• STORE.record_attempt() after every row: ok resets the counter, a
+  failure adds one; rows that failed MAX_ATTEMPTS times in a row are
+  left alone until RESUME_RETRY=1
+• RESUME=0 re-crawls everything in range (the old behaviour)
+• pdf_path(stage, subj, yr) – where each stage's PDF lives; the scripts
+  and pipeline.py plan from it without loading a crawler
+
+    python resume.py [COLUMN …]      # whole-CSV plan from values + attempts
+                                     # (csv + sqlite only – starts instantly)
+
+Records live next to the results in results.sqlite (results_store.py).
+"""
+
+from __future__ import annotations
+import os, re, sys, csv, collections
+from pathlib import Path
+from results_store import STORE, KEY_COLS
+
+RESUME       = os.environ.get("RESUME", "1") != "0"
+RETRY        = os.environ.get("RESUME_RETRY", "0") == "1"
+MAX_ATTEMPTS = 3
+BUCKETS      = ("done", "no value", "no PDF", "retry", "gave up")
+DATA_DIR     = Path("data")
+PDF_NAMES    = {
+    "understanding": "{s} - Understanding of the learning area.pdf",
+    "desc-ach":      "Level Description-Achievement standard-{s}-{y}.pdf",
+    "content":       "Content description-{s}-{y}.pdf",
+}
+
+slug = lambda s: re.sub(r"[\\/:'\"*?<>|]+", "_", str(s).strip())
+say  = lambda m: print(m, flush=True)
+
+def pdf_path(stage:str, subj:str, yr:str, root:Path=DATA_DIR) -> Path:
+    return root/slug(subj)/slug(yr)/PDF_NAMES[stage].format(s=subj, y=yr)
+
+# ─── planning ────────────────────────────────────────────────────────
+def filled(v) -> bool:
+    return isinstance(v, str) and v.strip() != ""
+
+def rows_of(df, rows, col:str) -> list[tuple]:
+    """(index, subject, year, CSV cell) per row – what classify() reads."""
+    has = col in df.columns
+    return [(i, df.at[i,"Subject"], df.at[i,"Year"], df.at[i,col] if has else None) for i in rows]
+
+def classify(rows:list[tuple], col:str, pdf_of=None) -> dict[str,list[tuple]]:
+    """Bucket each row; pdf_of(subj, yr) → Path (None = don't check PDFs)."""
+    if pdf_of is not None:
+        from pdf_out import PDF_MODE
+        if PDF_MODE == "off": pdf_of = None
+    vals, tries = STORE.metric(col), STORE.attempts(col)
+    out = {b: [] for b in BUCKETS}
+    for r in rows:
+        _, s, y, cell = r
+        has_val = filled(vals.get((s, y))) or filled(cell)
+        has_pdf = pdf_of is None or pdf_of(s, y).exists()
+        status, n, _ = tries.get((s, y), ("", 0, None))
+        if has_val and has_pdf:           b = "done"
+        elif status == "error":           b = "gave up" if n >= MAX_ATTEMPTS and not RETRY else "retry"
+        elif not has_val:                 b = "no value"
+        else:                             b = "no PDF"
+        out[b].append(r)
+    return out
+
+def report(col:str, buckets:dict[str,list[tuple]]):
+    todo = sum(len(buckets[b]) for b in ("no value", "no PDF", "retry"))
+    say(f"Plan – {col}: " + " · ".join(f"{len(buckets[b])} {b}" for b in BUCKETS)
+        + f"  → {todo} to crawl")
+    if buckets["gave up"]:
+        tries = STORE.attempts(col)
+        for i, s, y, _ in buckets["gave up"]:
+            _, n, err = tries[(s, y)]
+            say(f"   gave up  row {i}: {s} / {y}  ({n}× {err})")
+
+def plan(df, rows, col:str, pdf_of=None) -> list[int]:
+    """Pending row indices (in order) – prints the plan; RESUME=0 → all rows."""
+    rows = list(rows)
+    if not RESUME:
+        say(f"Plan – {col}: RESUME=0, all {len(rows)} rows"); return rows
+    b = classify(rows_of(df, rows, col), col, pdf_of)
+    report(col, b)
+    todo = {r[0] for k in ("no value", "no PDF", "retry") for r in b[k]}
+    return [i for i in rows if i in todo]
+
+# ─── CLI ─────────────────────────────────────────────────────────────
+def main(argv):
+    with open("FinalData.csv", newline="", encoding="utf-8") as fh:
+        recs = list(csv.DictReader(fh))
+    cols = argv or [c for c in (recs[0] if recs else {}) if c not in KEY_COLS]
+    for col in cols:
+        report(col, classify([(i, r["Subject"], r["Year"], r.get(col))
+                              for i, r in enumerate(recs)], col))
+    errs = collections.Counter(e for col in cols for st, _, e in STORE.attempts(col).values()
+                               if st == "error")
+    for e, n in errs.most_common(10):
+        say(f"{n:6}  {e}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
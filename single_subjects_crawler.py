@@ -4,17 +4,26 @@
 # Foundation + Year 1-10 and saves:
 #   html/<Subject>__<Year>.html
 #   single_subjects.csv   Subject,Year,URL,Status,UTC
+#
+# Foundation goes through the widget; later years are opened straight
+# from the learned URL pattern (FAST_URLS), widget as fallback.
+# data.csv is appended to; INCREMENTAL=1 bypasses the page cache and only
+# rewrites pages whose visible content changed since the last crawl.
 # ---------------------------------------------------------------
-import csv, pathlib, re, time, unicodedata, contextlib
+import csv, pathlib, re, unicodedata, contextlib
 from datetime import datetime, UTC
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+from page_cache import CACHE
+from curriculum_urls import area_of, pair_url, url_live
+from fingerprints import FP, INCREMENTAL
+from waits import settle
+import api_capture, spans, browser
+
 # ─── static look-ups taken from home.html ───────────────────────
 SUBJECTS = {          # data-value code : UI label
     "ENGENG": "English",
@@ -41,6 +50,8 @@ YEARS = {             # data-value code : UI label
 HOME_URL         = "https://v9.australiancurriculum.edu.au/"
 HTML_DIR         = pathlib.Path("html"); HTML_DIR.mkdir(exist_ok=True)
 CSV_PATH         = pathlib.Path("data.csv")
+FAST_URLS        = True     # build later years from the learned URL pattern
+HEADLESS         = True
 
 COOKIE_BTN       = "//button[contains(.,'Accept') or contains(.,'Consent')]"
 NAV_F10_JS       = "li.F10_CURRICULUM button"
@@ -51,6 +62,8 @@ BTN_YEAR         = "(//button[contains(@class,'InputSelector-button')])[2]"
 SUBMIT_CSS       = ("button.LearningAreaSelector-submitButton."
                     "LearningAreaSelector-button")
 
+HEADER_CSS       = "main div.CurriculumView-sectionHeader"
+
 # slide-out close button (search result page)
 SLIDE_XPATH      = ("//section[contains(@class,'SlideOut') and contains(@class,'is-open')]"
                     "/div/button")
@@ -67,7 +80,7 @@ def open_widget(drv):
     drv.execute_script("document.querySelector(arguments[0]).click()", NAV_F10_JS)
     WebDriverWait(drv, 10).until(
         EC.visibility_of_element_located((By.XPATH, POPUP_XPATH)))
-    time.sleep(0.5)
+    settle(drv, "open_widget", 0.5)
 
 def close_slideout_if_open(drv, timeout=5):
     """Dismiss blue ‘Understand the learning area’ slide-out if present."""
@@ -108,37 +121,74 @@ def crawl_pair(drv, subj_code, year_code):
         EC.invisibility_of_element_located((By.XPATH, POPUP_XPATH)))
     wait_dom(drv)
     close_slideout_if_open(drv)
-    time.sleep(1)
+    settle(drv, "pair_loaded", 1)
+    return "saved", drv.page_source, drv.current_url
+
+def load_home(drv):
+    drv.get(HOME_URL)
+    wait_dom(drv); settle(drv, "home", 2)
+
+    # accept cookies if shown
+    with contextlib.suppress(TimeoutException):
+        WebDriverWait(drv,4).until(
+            EC.element_to_be_clickable((By.XPATH, COOKIE_BTN))
+        ).click()
+
+def direct_pair(drv, area, year_code):
+    """Open a pair from the URL pattern; None → caller uses the widget."""
+    link = pair_url(area, year_code)
+    if not url_live(link):
+        return None
+    drv.get(link)
+    wait_dom(drv)
+    try:
+        WebDriverWait(drv, 8).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, HEADER_CSS)))
+    except TimeoutException:
+        return None
+    if area_of(drv.current_url) != area or link.split("?")[0] not in drv.current_url:
+        return None                                  # redirected elsewhere
+    close_slideout_if_open(drv)
+    settle(drv, "pair_loaded", 1)
     return "saved", drv.page_source, drv.current_url
 
 def main():
-    opts = Options()
-    opts.add_argument("--window-size=1400,900")
-    # opts.add_argument("--headless=new")   # uncomment for headless batch
-    drv = webdriver.Chrome(options=opts)
+    drv = browser.start(HEADLESS, (1400, 900))
 
     try:
-        with CSV_PATH.open("w", newline="", encoding="utf-8") as fcsv:
+        with CSV_PATH.open("a", newline="", encoding="utf-8") as fcsv:
             wr = csv.writer(fcsv)
-            wr.writerow(["Subject","Year","URL","Status","UTC"])
+            if fcsv.tell() == 0:
+                wr.writerow(["Subject","Year","URL","Status","UTC"])
 
             for s_code, s_lbl in SUBJECTS.items():
+                area = None                                  # learned per subject
                 for y_code, y_lbl in YEARS.items():
-                    drv.get(HOME_URL)
-                    wait_dom(drv); time.sleep(2)
-
-                    # accept cookies if shown
-                    with contextlib.suppress(TimeoutException):
-                        WebDriverWait(drv,4).until(
-                            EC.element_to_be_clickable((By.XPATH, COOKIE_BTN))
-                        ).click()
-
-                    status, html, link = crawl_pair(drv, s_code, y_code)
+                    pair = f"pair:{s_code}/{y_code}"
+                    fname = HTML_DIR / f"{safe(s_lbl)}__{safe(y_lbl)}.html"
+                    hit  = None if INCREMENTAL else CACHE.get(HOME_URL, pair)
+                    if hit:
+                        status, html, link = (hit["meta"]["status"], hit["html"],
+                                              hit["meta"]["url"])
+                    else:
+                        with spans.row("single", s_lbl, y_lbl, pair=pair):
+                            with spans.span("nav:direct"):
+                                res = direct_pair(drv, area, y_code) if FAST_URLS and area else None
+                            if res is None:
+                                with spans.span("nav:widget"):
+                                    load_home(drv)
+                                    res = crawl_pair(drv, s_code, y_code)
+                        status, html, link = res
+                        CACHE.put(HOME_URL, html or "", pair, status=status, url=link)
+                        api_capture.drain(drv, link or HOME_URL, pair)
+                    area = area or area_of(link)
+                    if status == "saved" and not FP.observe(link, "page", html) and fname.exists():
+                        print(f"= {fname.name} unchanged")
+                        continue
                     utc = datetime.now(UTC).isoformat(timespec="seconds")
                     wr.writerow([s_lbl, y_lbl, link or "", status, utc])
 
                     if status == "saved":
-                        fname = HTML_DIR / f"{safe(s_lbl)}__{safe(y_lbl)}.html"
                         fname.write_text(html, encoding="utf-8")
                         print(f"✔ {fname.name}")
                     else:
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+spans.py
+────────
+Per-stage timing for every crawler → spans.jsonl, plus a profile report
+
+• span(stage, **kv)     – context manager; one JSONL record per use
+• row(script, subj, yr) – tags every span inside it (any depth, same
+  thread) with the row, then writes a "row" span and the row's WebDriver
+  totals as "wd:<command>" spans {n, secs}
+• instrument(driver)    – times every WebDriver command (get, findElement,
+  executeScript, …) without touching the call sites
+• stages used by the scripts: nav, wait:<label>, sleep:<label>, card,
+  linked:<kind>, parse, pdf-write, pdf-reparse, csv-write, row,
+  page-load (browser.py – also carries bytes / requests), recycle
+
+    python spans.py [spans.jsonl] [--script NAME] [--top 15]
+        → n / total / p50 / p95 / max per stage, bytes per page and
+          the slowest rows; stages that enclose others (OUTER) and the
+          wd:* per-row totals are listed apart so totals never add up twice
+
+SPANS=0 in the environment turns logging off.
+"""
+
+from __future__ import annotations
+import os, json, time, argparse, threading, contextlib, collections
+from pathlib import Path
+
+# ─── tunables ────────────────────────────────────────────────────────
+SPAN_LOG = Path(os.environ.get("SPAN_LOG", "spans.jsonl"))
+LOG_ON   = os.environ.get("SPANS", "1") != "0"
+
+_lock  = threading.Lock()
+_local = threading.local()
+_fh    = None
+
+def ctx() -> dict:
+    """Row tags of the current thread (hand to other threads explicitly)."""
+    return getattr(_local, "ctx", {})
+
+def emit(stage:str, secs:float, **kv):
+    global _fh
+    if not LOG_ON: return
+    rec = {"stage": stage, "secs": round(secs, 4), "ts": round(time.time(), 3),
+           **ctx(), **kv}
+    with _lock:
+        if _fh is None:
+            _fh = SPAN_LOG.open("a", encoding="utf-8", buffering=1)
+        _fh.write(json.dumps(rec) + "\n")
+
+@contextlib.contextmanager
+def span(stage:str, **kv):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit(stage, time.perf_counter() - t0, **kv)
+
+@contextlib.contextmanager
+def row(script:str, subj:str, yr:str, **kv):
+    old, old_wd = ctx(), getattr(_local, "wd", None)
+    _local.ctx = {"script": script, "subject": subj, "year": yr}
+    _local.wd  = collections.defaultdict(lambda: [0, 0.0])
+    t0, ok = time.perf_counter(), False
+    try:
+        yield
+        ok = True
+    finally:
+        for cmd, (n, s) in _local.wd.items():
+            emit(f"wd:{cmd}", s, n=n)
+        emit("row", time.perf_counter() - t0, ok=ok, **kv)
+        _local.ctx, _local.wd = old, old_wd
+
+def instrument(driver):
+    """Wrap driver.execute so every WebDriver command is timed per row."""
+    if not LOG_ON: return driver
+    execute = driver.execute
+    def timed(cmd, params=None):
+        t0 = time.perf_counter()
+        try:
+            return execute(cmd, params)
+        finally:
+            wd = getattr(_local, "wd", None)
+            if wd is not None:
+                a = wd[cmd]; a[0] += 1; a[1] += time.perf_counter() - t0
+    driver.execute = timed
+    return driver
+
+# ─── report ──────────────────────────────────────────────────────────
+OUTER = ("row", "stage:", "card", "drawer", "linked:")   # wrap nav / wait / parse / …
+
+def group(stage:str) -> int:
+    if stage.startswith("wd:"): return 2
+    return 1 if stage.startswith(OUTER) else 0
+def pct(xs:list[float], p:float) -> float:
+    return xs[min(len(xs)-1, int(p * len(xs)))] if xs else 0.0
+
+def summary(path:Path=SPAN_LOG, script:str|None=None, top:int=15):
+    stages, rows = collections.defaultdict(list), []
+    calls, moved = collections.Counter(), collections.defaultdict(list)
+    for ln in path.read_text("utf-8").splitlines():
+        r = json.loads(ln)
+        if script and r.get("script") != script: continue
+        stages[r["stage"]].append(r["secs"]); calls[r["stage"]] += r.get("n", 1)
+        if r["stage"] == "row": rows.append(r)
+        if "bytes" in r: moved[r["stage"]].append((r["bytes"], r.get("requests", 0)))
+    titles = ("", "\nenclosing stages (time includes the stages above)",
+              "\nWebDriver commands (n = calls; total / p50 / p95 / max over per-row totals)")
+    for g, title in enumerate(titles):
+        got = sorted(((st, xs) for st, xs in stages.items() if group(st) == g),
+                     key=lambda kv: sum(kv[1]), reverse=True)
+        if not got: continue
+        if title: print(title)
+        print(f"{'stage':32} {'n':>8} {'total s':>10} {'p50':>8} {'p95':>8} {'max':>8}")
+        for st, xs in got:
+            xs.sort()
+            print(f"{st:32} {calls[st]:8} {sum(xs):10.1f} {pct(xs,.5):8.3f} "
+                  f"{pct(xs,.95):8.3f} {xs[-1]:8.3f}")
+    for st, xs in moved.items():
+        b = sorted(x for x, _ in xs)
+        print(f"\n{st}: {len(xs)} pages, {sum(b)/1e6:.1f} MB, {pct(b,.5)/1e3:.0f} KB p50 / "
+              f"{pct(b,.95)/1e3:.0f} KB p95, {sum(n for _, n in xs)/len(xs):.0f} requests/page")
+    print("\nslowest rows")
+    for r in sorted(rows, key=lambda r: r["secs"], reverse=True)[:top]:
+        print(f"{r['secs']:9.1f}s  {r.get('script','')[:22]:22} "
+              f"{r.get('subject','')} / {r.get('year','')}{'' if r.get('ok') else '  (failed)'}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Crawl profile from spans.jsonl")
+    ap.add_argument("path", nargs="?", type=Path, default=SPAN_LOG)
+    ap.add_argument("--script")
+    ap.add_argument("--top", type=int, default=15)
+    a = ap.parse_args()
+    summary(a.path, a.script, a.top)
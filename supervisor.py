@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+supervisor.py
+─────────────
+Keeps one long-lived Chrome healthy over a whole batch
+
+• Supervised(start) owns the driver; a worker hands it each row as
+  sup.run(fn, *args) → fn(driver, *args).  On a hang or crash (client
+  call timeout, renderer timeout, dead session / tab) the driver is
+  restarted and the row runs again from the top – cards, drawers and
+  linked pages already fetched come back from the memo / page cache
+• after every row the driver is recycled when
+    – chromedriver + its Chrome processes use more than MAX_RSS_MB of
+      proportional set size (procfs smaps_rollup Pss – shared pages split
+      between the processes sharing them, so the renderers' common
+      libraries and shared memory count once; RSS where Pss can't be
+      read, the page's JS heap where there is no /proc)
+    – the median WebDriver call over the last WINDOW calls is SLOW_FACTOR
+      times the median of the first WINDOW calls after a (re)start
+    – MAX_ROWS rows have run on it
+• every command gets a client-side timeout (CALL_TIMEOUT) so a hung
+  renderer raises instead of stalling the batch
+• a restart quits with a short timeout, then kills whatever is left of
+  the chromedriver/Chrome process tree – each pid only if its start time
+  is unchanged, so a pid reused after quit() is never hit; each restart
+  is logged as a "recycle" span with its reason
+"""
+
+from __future__ import annotations
+import os, time, signal, socket, statistics, contextlib, collections
+from pathlib import Path
+import spans
+
+MAX_RSS_MB   = int(os.environ.get("DRIVER_MAX_RSS_MB", "2500"))
+MAX_ROWS     = int(os.environ.get("DRIVER_MAX_ROWS", "60"))
+SLOW_FACTOR  = 3.0
+SLOW_FLOOR   = 0.05        # s – medians below this never count as slow
+WINDOW       = 200         # calls per latency sample
+CALL_TIMEOUT = 120         # s – any single WebDriver HTTP call
+PAGE_TIMEOUT = 60          # s – driver.get()
+UNTIMED      = {"get", "w3cExecuteScriptAsync"}   # waits by design
+CRASH_MSGS   = ("tab crashed", "session deleted", "disconnected", "not reachable",
+                "no such window", "target window already closed", "invalid session id",
+                "timed out receiving message from renderer")
+
+say = lambda m: print(m, flush=True)
+
+def fatal(e:Exception) -> str|None:
+    """Why e means the driver itself is gone or hung (None = row-level error)."""
+    from urllib3.exceptions import HTTPError
+    if isinstance(e, (socket.timeout, TimeoutError, HTTPError, ConnectionError)):
+        return f"hang ({e.__class__.__name__})"
+    msg = str(e).lower()
+    return next((f"crash ({m})" for m in CRASH_MSGS if m in msg), None)
+
+# ─── process tree ────────────────────────────────────────────────────
+PROC = Path("/proc")
+
+def stat(p:int) -> list[str]|None:
+    """/proc/<p>/stat fields 3… (after "(comm)"): [1] ppid, [19] start time, [21] rss."""
+    try:
+        return (PROC/str(p)/"stat").read_text().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+
+def tree(pid:int) -> dict[int,list[str]]|None:
+    """{pid: stat fields} for pid and all its descendants (Linux procfs)."""
+    if not PROC.is_dir(): return None
+    kids, info = collections.defaultdict(list), {}
+    for d in PROC.glob("[0-9]*"):
+        if (f := stat(int(d.name))) is None: continue
+        kids[int(f[1])].append(int(d.name)); info[int(d.name)] = f
+    todo, out = [pid], {}
+    while todo:
+        p = todo.pop()
+        if p in info: out[p] = info[p]
+        todo += kids.get(p, [])
+    return out
+
+def pss(p:int, f:list[str]) -> int:
+    """Proportional set size in bytes, resident size where smaps_rollup is unreadable."""
+    try:
+        for ln in (PROC/str(p)/"smaps_rollup").read_text().splitlines():
+            if ln.startswith("Pss:"): return int(ln.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return int(f[21]) * os.sysconf("SC_PAGE_SIZE")
+
+def driver_pid(d) -> int|None:
+    return getattr(getattr(getattr(d, "service", None), "process", None), "pid", None)
+
+def driver_mb(d) -> float:
+    pid = driver_pid(d)
+    t = tree(pid) if pid else None
+    b = sum(pss(p, f) for p, f in t.items()) if t else None
+    if b is None:
+        with contextlib.suppress(Exception):
+            b = d.execute_script("return performance.memory && performance.memory.usedJSHeapSize")
+    return (b or 0) / 2**20
+
+# ─── supervised driver ───────────────────────────────────────────────
+class Supervised:
+    def __init__(self, start):
+        self.start, self.d = start, None
+        self.rows, self.base = 0, None
+        self.calls:collections.deque = collections.deque(maxlen=WINDOW)
+
+    @property
+    def driver(self):
+        if self.d is None: self._boot()
+        return self.d
+
+    def _boot(self):
+        d = self.start()
+        d.set_page_load_timeout(PAGE_TIMEOUT)
+        d.command_executor._client_config.timeout = CALL_TIMEOUT   # per-instance HTTP timeout
+        execute = d.execute
+        def timed(cmd, params=None):
+            t0 = time.perf_counter()
+            try:
+                return execute(cmd, params)
+            finally:
+                if cmd not in UNTIMED: self.calls.append(time.perf_counter() - t0)
+        d.execute = timed
+        self.d, self.rows, self.base = d, 0, None
+        self.calls.clear()
+
+    def recycle(self, why:str):
+        with spans.span("recycle", reason=why, rows=self.rows):
+            if self.d is not None:
+                pid = driver_pid(self.d)
+                left = tree(pid) or {} if pid else {}
+                self.d.command_executor._client_config.timeout = 10
+                with contextlib.suppress(Exception): self.d.quit()
+                for p, f in left.items():
+                    if (now := stat(p)) is None or now[19] != f[19]: continue   # gone / pid reused
+                    with contextlib.suppress(OSError): os.kill(p, signal.SIGKILL)
+            self.d = None
+        say(f"   ♻ driver restarted – {why}")
+
+    def health(self) -> str|None:
+        if self.d is None: return None
+        if self.rows >= MAX_ROWS:
+            return f"{self.rows} rows"
+        if len(self.calls) == WINDOW:
+            med = statistics.median(self.calls)
+            if self.base is None:
+                self.base = med
+            elif med > max(SLOW_FLOOR, SLOW_FACTOR * self.base):
+                return f"calls {med*1e3:.0f} ms vs {self.base*1e3:.0f} ms"
+            self.calls.clear()
+        mb = driver_mb(self.d)
+        return f"{mb:.0f} MB" if mb > MAX_RSS_MB else None
+
+    def run(self, fn, *args):
+        """fn(driver, *args); one restart + retry if the driver hangs or dies."""
+        try:
+            for attempt in (1, 2):
+                try:
+                    return fn(self.driver, *args)
+                except Exception as e:
+                    why = fatal(e)
+                    if why is None: raise
+                    self.recycle(why)             # never hand a dead driver to the next row
+                    if attempt == 2: raise
+        finally:
+            self.rows += 1
+            if why := self.health(): self.recycle(why)
+
+    def quit(self):
+        if self.d is not None:
+            with contextlib.suppress(Exception): self.d.quit()
+            self.d = None
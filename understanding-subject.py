@@ -2,18 +2,29 @@
 """
 Batch scraper — identical per-row logic used for rows 0 & 1,
 now applied to every row in FinalData.csv
+
+The learning-area page depends on the subject only, so by default rows
+are grouped by Subject: the page is resolved, extracted and counted once
+and the count (plus a link to the one PDF) fanned out to every Year row.
+Set BY_SUBJECT = False (or pass --per-row) for the old per-row walk.
+
+Rows that already have a count and a PDF are skipped before Chrome starts;
+a subject is only revisited for its pending rows (RESUME=0 re-crawls
+everything – see resume.py).
 """
 
 from __future__ import annotations
-import re, textwrap, traceback, contextlib, sys, time
+import re, traceback, contextlib, sys
 from pathlib import Path
 import pandas as pd
-from bs4 import BeautifulSoup, element as bs4
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen.canvas import Canvas
-from PyPDF2 import PdfReader
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from page_cache import CACHE
+from results_store import STORE
+from fingerprints import FP, INCREMENTAL
+from resume import plan, pdf_path as stage_pdf
+from waits import settle
+from extractors import extract_lines
+import pdf_out, spans, browser
+from supervisor import Supervised, fatal
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -21,32 +32,22 @@ from selenium.webdriver.support import expected_conditions as EC
 # ── constants ──────────────────────────────────────────────
 CSV_FILE      = Path("FinalData.csv")
 DATA_DIR      = Path("data")
-HEADLESS      = False          # show Chrome
+HEADLESS      = True           # --headed (cli.py) to watch it
 PAGE_TIMEOUT  = 35
 WAIT          = 15
-BASE_PT       = 10
 WRAP          = 90
 MARGIN        = 40
 LINE_SP       = 1.4
 COL           = "Understanding of the learning area"
 SEGMENT       = "/curriculum-information/understand-this-learning-area/"
+BY_SUBJECT    = "--per-row" not in sys.argv
 
-FONT = {
-    "h1": ("Helvetica-Bold",18), "h2": ("Helvetica-Bold",16),
-    "h3": ("Helvetica-Bold",14), "h4": ("Helvetica-Bold",12),
-    "h5": ("Helvetica-Bold",11), "h6": ("Helvetica-Bold",10),
-}
-DEF_FONT = ("Helvetica", BASE_PT); BULLET = ("Helvetica-Bold", BASE_PT)
-WRE = re.compile(r"\b[\w'-]+\b", re.UNICODE)
 slug = lambda s: re.sub(r"[\\/:'\"*?<>|]+", "_", str(s).strip())
 say  = lambda m: print(m, flush=True)
 
 # ── selenium helpers ──────────────────────────────────────
 def start_drv():
-    o = Options()
-    if HEADLESS: o.add_argument("--headless=new")
-    o.add_argument("--window-size=1400,1000")
-    return webdriver.Chrome(options=o)
+    return browser.start(HEADLESS, (1400, 1000))
 
 def ready(d): return d.execute_script("return document.readyState")=="complete"
 
@@ -56,94 +57,149 @@ def locate_cta(d):
     return WebDriverWait(d,5).until(EC.element_to_be_clickable((By.CSS_SELECTOR,sel)))
 
 def expand_all(d):
-    for b in d.find_elements(
+    btns=d.find_elements(
             By.CSS_SELECTOR,
             "section.ContentToggle:not(.is-open) > header > button, "
-            "button[aria-expanded='false']"):
+            "button[aria-expanded='false']")
+    for b in btns:
         with contextlib.suppress(Exception):
-            d.execute_script("arguments[0].click()", b); time.sleep(.05)
-
-# ── extract helpers ───────────────────────────────────────
-def _clean(n):
-    for t in n(["script","style","noscript","iframe","nav"]): t.decompose()
-    for t in n.find_all(lambda x:isinstance(x,bs4.Tag) and (
-            x.get("aria-hidden")=="true" or "display:none" in (x.get("style") or ""))):
-        t.decompose()
-
-def _yield(main):
-    for t in main.descendants:
-        if isinstance(t,bs4.Tag) and t.name in {"h1","h2","h3","h4","h5","h6","p","li","blockquote"}:
-            txt=" ".join(t.get_text(" ",strip=True).split())
-            if txt: yield t.name, txt
-
-def extract_lines(html):
-    soup=BeautifulSoup(html,"lxml")
-    main=soup.select_one("#main-content"); _clean(main)
-    lines=[]
-    title=soup.select_one("header[id^='title-'] h1")
-    if title: lines.append((title.text.strip(), *FONT["h1"]))
-    for h in main.find_all(["h2","h3","h4","h5","h6"]):
-        if h.text.strip().lower().startswith("resources"):
-            for x in list(h.find_all_next()): x.decompose(); h.decompose(); break
-    for tag,txt in _yield(main):
-        lines.append(("• "+txt,*BULLET) if tag=="li" else (txt,*FONT.get(tag,DEF_FONT)))
-    return lines
-
-# ── PDF utils ─────────────────────────────────────────────
-def write_pdf(lines, path):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    c=Canvas(str(path), pagesize=A4)
-    w,h=A4; x,y=MARGIN,h-MARGIN
-    for txt, font, sz in lines:
-        c.setFont(font,sz)
-        for seg in textwrap.wrap(txt, WRAP) or [""]:
-            if y<MARGIN: c.showPage(); y=h-MARGIN; c.setFont(font,sz)
-            c.drawString(x,y,seg); y-=sz*LINE_SP
-    c.save()
-
-def pdf_words(p):
-    txt="\n".join(pg.extract_text() or "" for pg in PdfReader(str(p)).pages)
-    return len(WRE.findall(txt))
-
-# ── per-row process (unchanged) ──────────────────────────
-def process(d, subj, yr, url):
+            d.execute_script("arguments[0].click()", b)
+    if btns: settle(d,"expand",.05*len(btns))     # was 0.05 per click
+
+# ── per-row process ─────────────────────────────────────
+def learning_area_html(d, url, loaded=False):
+    """Rendered learning-area page for a row, read through the page cache.
+
+    loaded=True: the row page is already open with its slide-out (pipeline.py).
+    """
+    hit = CACHE.get(url, "understanding")
+    if hit: return hit["html"]
+
+    if not loaded:
+        with spans.span("nav"):
+            d.get(url); WebDriverWait(d,PAGE_TIMEOUT).until(ready)
+    cta=locate_cta(d); target=cta.get_attribute("href")
+    hit = CACHE.get(target, "expanded") if target else None
+    if hit:
+        html=hit["html"]
+    else:
+        home=d.current_window_handle
+        if target:                                # lean tab before the first request
+            browser.open_tab(d, target)
+        else:                                     # JS-only CTA: lean from the next load on
+            before=d.window_handles.copy()
+            cta.click()
+            WebDriverWait(d,WAIT).until(lambda drv: len(drv.window_handles)>len(before))
+            d.switch_to.window(d.window_handles[-1]); browser.lean_tab(d)
+        WebDriverWait(d,PAGE_TIMEOUT).until(lambda drv: SEGMENT in drv.current_url)
+        WebDriverWait(d,PAGE_TIMEOUT).until(ready)
+
+        expand_all(d); settle(d,"expanded",.3)
+        html=d.page_source; target=d.current_url
+        CACHE.put(target, html, "expanded")
+        browser.close_tab(d, home)
+    CACHE.put(url, html, "understanding", target=target)
+    return html
+
+def pdf_path(subj, yr):
+    return stage_pdf("understanding", subj, yr, DATA_DIR)
+
+def process(d, subj, yr, url, loaded=False):
     say(f"\n>>> {subj} / {yr}")
-    d.get(url); WebDriverWait(d,PAGE_TIMEOUT).until(ready)
-
-    before=d.window_handles.copy()
-    locate_cta(d).click()
-    WebDriverWait(d,WAIT).until(lambda drv: len(drv.window_handles)>len(before))
-    d.switch_to.window(d.window_handles[-1])
-    WebDriverWait(d,PAGE_TIMEOUT).until(lambda drv: SEGMENT in drv.current_url)
-    WebDriverWait(d,PAGE_TIMEOUT).until(ready)
-
-    expand_all(d); time.sleep(.3)
-    lines=extract_lines(d.page_source)
-    pdf=DATA_DIR/slug(subj)/slug(yr)/f"{subj} - Understanding of the learning area.pdf"
-    write_pdf(lines, pdf); wc=pdf_words(pdf)
+    html=learning_area_html(d, url, loaded)
+    with spans.span("parse"): lines=extract_lines(html)
+    pdf=pdf_path(subj, yr)
+    wc=pdf_out.emit(lines, pdf, margin=MARGIN, line_sp=LINE_SP, wrap=WRAP)
     say(f"   PDF → {pdf}  ({wc} words)")
-    d.close(); d.switch_to.window(before[0])
     return wc
 
+# ── per-subject fan-out ──────────────────────────────────
+def process_subject(d, subj, rows):
+    """rows: [(index, year, url), …] for one subject → {index: wc}."""
+    say(f"\n>>> {subj}  ({len(rows)} rows)")
+    html=target=None
+    for i,yr,url in rows:       # first row whose page resolves wins
+        try:
+            html=learning_area_html(d, url)
+            hit=CACHE.get(url,"understanding"); target=hit and hit["meta"].get("target")
+            break
+        except Exception as e:
+            if fatal(e): raise            # driver gone – Supervised restarts and re-runs the subject
+            say(f"!! row {i}: {e.__class__.__name__} – trying next Year")
+    if html is None:
+        raise ValueError(f"no learning-area page for {subj}")
+
+    for _,_,url in rows:        # every row replays offline from the cache;
+        if CACHE.get(url,"understanding") is None:     # target lets subject_changed() probe
+            CACHE.put(url, html, "understanding", target=target)
+    with spans.span("parse"): lines=extract_lines(html)
+    shared=pdf_path(subj, rows[0][1])
+    wc=pdf_out.emit(lines, shared, margin=MARGIN, line_sp=LINE_SP, wrap=WRAP,
+                    links=[pdf_path(subj, yr) for _,yr,_ in rows[1:]])
+    say(f"   PDF → {shared}  ({wc} words)")
+    return {i: wc for i,_,_ in rows}
+
+def subject_changed(subj, rows):
+    """INCREMENTAL: re-probe the learning-area page behind this subject."""
+    target=next((t for _,_,u in rows if (h:=CACHE.get(u,"understanding"))
+                 and (t:=h["meta"].get("target"))), None)     # older copies carry none
+    if not target: return True
+    since=[STORE.updated(subj,yr,COL) for _,yr,_ in rows]
+    moved=FP.probe(target,"learning-area")
+    if moved is False and None not in since and FP.changed(target,"learning-area")<min(since):
+        return False
+    for _,_,u in rows: CACHE.drop(u,"understanding")
+    CACHE.drop(target,"expanded")
+    return True
+
 # ── main loop ────────────────────────────────────────────
-def main():
+def main(rows=None):
+    """rows: row indices to consider (default all – cli.py passes --from/--to)."""
     if not CSV_FILE.exists(): say("CSV missing"); return
     df=pd.read_csv(CSV_FILE,dtype=str)
-    if COL not in df.columns: df[COL]=""
+    rows=[i for i in df.index if rows is None or i in rows]
+    todo=set(rows if INCREMENTAL else plan(df, rows, COL, pdf_path))
+    if not todo: return
 
-    drv=start_drv()
+    sup=Supervised(start_drv)    # restarts Chrome on a hang or memory growth
     try:
+        if BY_SUBJECT:
+            for subj,grp in df.groupby("Subject", sort=False):
+                rows=[(i,r["Year"],r["URL"]) for i,r in grp.iterrows() if i in todo]
+                if not rows: continue
+                if INCREMENTAL and not subject_changed(subj,rows):
+                    say(f"= {subj} unchanged"); continue
+                try:
+                    with spans.row("understanding", subj, "*", rows=len(rows)):
+                        res=sup.run(process_subject,subj,rows)
+                    for i,wc in res.items():
+                        STORE.upsert(subj, df.at[i,"Year"], COL, wc)
+                        STORE.record_attempt(subj, df.at[i,"Year"], COL)
+                except Exception as e:
+                    for _,yr,_ in rows: STORE.record_attempt(subj, yr, COL, e.__class__.__name__)
+                    say(f"!! {subj}: {e.__class__.__name__}")
+                    traceback.print_exc(limit=1)
+                    with contextlib.suppress(Exception):
+                        Path(f"fail_{slug(subj)}.html").write_text(sup.d.page_source,"utf-8")
+            return
+
         for i,row in df.iterrows():
+            if i not in todo: continue
             try:
-                wc=process(drv,row["Subject"],row["Year"],row["URL"])
-                df.at[i,COL]=wc; df.to_csv(CSV_FILE,index=False)
+                with spans.row("understanding", row["Subject"], row["Year"], url=row["URL"]):
+                    wc=sup.run(process,row["Subject"],row["Year"],row["URL"])
+                STORE.upsert(row["Subject"], row["Year"], COL, wc)
+                STORE.record_attempt(row["Subject"], row["Year"], COL)
             except Exception as e:
+                STORE.record_attempt(row["Subject"], row["Year"], COL, e.__class__.__name__)
                 say(f"!! row {i}: {e.__class__.__name__}")
                 traceback.print_exc(limit=1)
-                Path(f"fail_{slug(row['Subject'])}_{slug(row['Year'])}.html")\
-                    .write_text(drv.page_source,"utf-8")
+                with contextlib.suppress(Exception):
+                    Path(f"fail_{slug(row['Subject'])}_{slug(row['Year'])}.html")\
+                        .write_text(sup.d.page_source,"utf-8")
     finally:
-        drv.quit(); say("\nDone.")
+        sup.quit(); pdf_out.flush()
+        say(f"\nDone – {STORE.export(CSV_FILE,(COL,))} cells exported → {CSV_FILE}")
 
 if __name__=="__main__":
     main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+waits.py
+────────
+Event-driven replacement for the crawlers' fixed time.sleep() calls
+
+• settle(d, label, budget) returns as soon as the page is quiet: no DOM
+  mutation (MutationObserver) and no fetch/XHR in flight for the quiet
+  window, counted from the call – work triggered just before it (a click)
+  always gets a full quiet window to show up
+• both scale with the sleep being replaced: quiet = budget within
+  [QUIET_MIN, QUIET], timeout = TIMEOUT_X × budget within [2 × quiet,
+  TIMEOUT] – a hot-path 0.03 s wait is never held 5 s by a long-poll
+  fetch or a page that keeps mutating
+• every wait is appended to WAIT_LOG as JSONL {label, waited, budget}
+  where budget = the fixed sleep it replaces
+• python waits.py [waits.jsonl]  → per-label totals and time saved
+"""
+
+from __future__ import annotations
+import sys, json, time, threading, collections
+from pathlib import Path
+import spans
+
+# ─── tunables ────────────────────────────────────────────────────────
+QUIET     = 0.12       # seconds of DOM + network silence = settled (upper bound)
+QUIET_MIN = 0.03       # … lower bound, for the tiny scroll / back budgets
+TIMEOUT   = 5.0        # hard cap per settle()
+TIMEOUT_X = 4.0        # a wait may run to this multiple of its budget
+WAIT_LOG = Path("waits.jsonl")
+LOG_ON   = True
+
+_lock = threading.Lock()
+
+SETTLE_JS = """
+const [quiet, limit, done] = arguments, w = window;
+if (!w.__settle) {
+  const s = w.__settle = {last: performance.now(), inflight: 0};
+  const bump = () => { s.last = performance.now(); };
+  new MutationObserver(bump).observe(document, {subtree: true, childList: true,
+                                     attributes: true, characterData: true});
+  if (w.fetch) {
+    const f = w.fetch;
+    w.fetch = function () {
+      s.inflight++;
+      return f.apply(this, arguments).finally(() => { s.inflight--; bump(); });
+    };
+  }
+  const send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    s.inflight++;
+    this.addEventListener("loadend", () => { s.inflight--; bump(); });
+    return send.apply(this, arguments);
+  };
+}
+w.__settle.last = performance.now();     // quiet is measured from this call
+const t0 = performance.now();
+(function tick() {
+  const s = w.__settle, now = performance.now();
+  if ((s.inflight <= 0 && now - s.last >= quiet) || now - t0 >= limit) done(now - t0);
+  else setTimeout(tick, 20);
+})();
+"""
+
+def record(label:str, waited:float, budget:float):
+    if not LOG_ON: return
+    rec = {"label": label, "waited": round(waited, 4), "budget": budget,
+           "ts": round(time.time(), 3)}
+    with _lock, WAIT_LOG.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(rec) + "\n")
+
+def settle(d, label:str, budget:float=0.0, quiet:float|None=None,
+           timeout:float|None=None) -> float:
+    """Wait until the DOM and network are quiet; returns seconds waited.
+
+    budget is the fixed sleep being replaced – it sizes the quiet window
+    and the timeout, goes to the log, and is the fallback sleep if the
+    page can't run the observer (mid-navigation etc.).
+    """
+    if quiet is None:
+        quiet = min(QUIET, max(QUIET_MIN, budget))
+    if timeout is None:
+        timeout = min(TIMEOUT, max(2 * quiet, TIMEOUT_X * budget))
+    t0, kind = time.perf_counter(), "wait"
+    try:
+        d.set_script_timeout(timeout + 1)
+        d.execute_async_script(SETTLE_JS, quiet * 1000, timeout * 1000)
+    except Exception:
+        time.sleep(budget); kind = "sleep"
+    waited = time.perf_counter() - t0
+    record(label, waited, budget); spans.emit(f"{kind}:{label}", waited)
+    return waited
+
+# ─── report ──────────────────────────────────────────────────────────
+def summary(path:Path=WAIT_LOG):
+    agg = collections.defaultdict(lambda: [0, 0.0, 0.0])
+    for ln in path.read_text("utf-8").splitlines():
+        r = json.loads(ln); a = agg[r["label"]]
+        a[0] += 1; a[1] += r["waited"]; a[2] += r["budget"]
+    print(f"{'label':28} {'n':>7} {'waited s':>10} {'sleeps s':>10} {'saved s':>10}")
+    tot = [0, 0.0, 0.0]
+    for lbl, (n, w, b) in sorted(agg.items(), key=lambda kv: kv[1][2]-kv[1][1], reverse=True):
+        print(f"{lbl:28} {n:7} {w:10.1f} {b:10.1f} {b-w:10.1f}")
+        tot = [tot[0]+n, tot[1]+w, tot[2]+b]
+    print(f"{'TOTAL':28} {tot[0]:7} {tot[1]:10.1f} {tot[2]:10.1f} {tot[2]-tot[1]:10.1f}")
+
+if __name__ == "__main__":
+    summary(Path(sys.argv[1]) if len(sys.argv) > 1 else WAIT_LOG)